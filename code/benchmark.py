@@ -0,0 +1,147 @@
+'''
+Measure how the stages of the analysis scale on synthetic panels, e.g. from the code directory:
+
+    python benchmark.py --sizes 20x200 200x300 2000x500 10000x500 --repeats 3 --output ../benchmarks/results.csv
+
+For each size (countries x years), the datasets are generated by synthetic.synthetic_datasets and each stage is timed
+(fastest of the repeats) and run once more under tracemalloc for its peak memory, for method 1 and method 2.
+The results are appended to the csv file with the commit and the date, so that regressions are visible.
+'''
+import argparse
+import datetime
+import os
+import platform
+import time
+import tracemalloc
+import pandas as pd
+import dataset
+import events
+import extraction_method_1
+import extraction_method_2
+from benchmark_imports import current_commit
+from synthetic import synthetic_datasets
+from visualisation import compute_pattern
+
+# Sizes of the synthetic panels measured by default, as (countries, years)
+SIZES = [(20, 200), (200, 300), (2000, 500), (10000, 500)]
+
+METHODS = {1: extraction_method_1, 2: extraction_method_2}
+
+def measure(function, repeats=3):
+    '''
+    Time a function and measure the peak memory it allocates.
+
+    Args:
+    function (function): A function without arguments.
+    repeats (int, optional): The number of timed calls. Default is 3.
+
+    Returns:
+    float: The fastest time of the calls in seconds.
+    float: The peak memory allocated by one more call, in MB, as traced by tracemalloc.
+    object: The output of the function.
+    '''
+    times = []
+    for _ in range(max(repeats, 1)):
+        start = time.perf_counter()
+        output = function()
+        times.append(time.perf_counter() - start)
+
+    # The memory is traced on a separate call, as tracing slows the allocations down
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(times), peak / 2 ** 20, output
+
+def benchmark_size(n_countries, n_years, repeats=3, seed=0):
+    '''
+    Measure the stages of the analysis on a synthetic panel.
+
+    Args:
+    n_countries (int): The number of countries of the panel.
+    n_years (int): The largest number of years of a country.
+    repeats (int, optional): The number of timed calls of each stage. Default is 3.
+    seed (int, optional): The seed of the synthetic datasets. Default is 0.
+
+    Returns:
+    DataFrame: One row per stage and method ('-' for the stages shared by the methods), with the 'rows' of the panel,
+    the 'seconds' and the 'peak_mb' of the stage.
+    '''
+    main_data, GDP_pc = synthetic_datasets(n_countries, n_years, seed=seed)
+    countries = list(main_data['CC3'].unique())
+    rows = []
+
+    def record(stage, method, function, rows_of=None):
+        seconds, peak_mb, output = measure(function, repeats)
+        rows.append({'countries': n_countries, 'years': n_years, 'rows': len(main_data) if rows_of is None else len(rows_of),
+                     'stage': stage, 'method': method, 'seconds': seconds, 'peak_mb': peak_mb})
+        return output
+
+    # Stages shared by the methods, on the left (inflation) and inner (output gap) panels
+    left = record('concat_dataset', '-', lambda: dataset.concat_dataset(main_data, GDP_pc, countries, 'left'))
+    record('dummy_variable', '-', lambda: dataset.dummy_variable(left), left)
+    inner = dataset.concat_dataset(main_data, GDP_pc, countries, 'inner')
+    dataset.dummy_variable(inner)
+    record('crisis_events', '-', lambda: events.crisis_events(left), left)
+
+    for method, module in METHODS.items():
+        record('compute_crisis_duration', method, lambda: module.compute_crisis_duration(left), left)
+        series = record('extract_inflation_series', method, lambda: module.extract_inflation_series(left), left)
+        normalized = record('normalize_serie', method, lambda: module.normalize_serie(series), left)
+        record('compute_pattern', method, lambda: compute_pattern(normalized), left)
+        record('extract_output_gap_series', method, lambda: module.extract_output_gap_series(inner), inner)
+        record('inflation_dynamics', method, lambda: (module.inflation_dynamics(left, during_crisis=True),
+                                                      module.inflation_dynamics(left, during_crisis=False)), left)
+        record('output_gap_dynamics', method, lambda: (module.output_gap_dynamics(inner, during_crisis=True),
+                                                       module.output_gap_dynamics(inner, during_crisis=False)), inner)
+
+    return pd.DataFrame(rows)
+
+def run_benchmarks(sizes=SIZES, repeats=3, seed=0):
+    '''
+    Measure the stages of the analysis on synthetic panels of several sizes.
+
+    Args:
+    sizes (list, optional): The (countries, years) of the panels. Default is SIZES.
+    repeats (int, optional): The number of timed calls of each stage. Default is 3.
+    seed (int, optional): The seed of the synthetic datasets. Default is 0.
+
+    Returns:
+    DataFrame: The rows of benchmark_size of all the sizes.
+    '''
+    return pd.concat([benchmark_size(n_countries, n_years, repeats, seed) for n_countries, n_years in sizes], ignore_index=True)
+
+def main(argv=None):
+    '''
+    Run the benchmarks from the command-line arguments and append their results to the output file.
+
+    Args:
+    argv (list, optional): The arguments, without the program name. Default is sys.argv[1:].
+    '''
+    parser = argparse.ArgumentParser(description='Time and peak memory of the stages of the analysis on synthetic panels.')
+    parser.add_argument('--sizes', nargs='+', default=[f'{countries}x{years}' for countries, years in SIZES],
+                        help='Sizes of the panels, as COUNTRIESxYEARS.')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of timed calls of each stage.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic datasets.')
+    parser.add_argument('--output', default='../benchmarks/results.csv', help='CSV file the results are appended to.')
+    arguments = parser.parse_args(argv)
+
+    sizes = [tuple(int(value) for value in size.lower().split('x')) for size in arguments.sizes]
+    results = run_benchmarks(sizes, arguments.repeats, arguments.seed)
+
+    # Method 1 and method 2 side by side
+    table = results.pivot_table(index=['countries', 'years', 'stage'], columns='method', values=['seconds', 'peak_mb'], sort=False)
+    print(table.round(4).to_string())
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results.insert(0, 'python_version', platform.python_version())
+    results.insert(0, 'commit', current_commit(directory))
+    results.insert(0, 'date', datetime.datetime.now().isoformat(timespec='seconds'))
+
+    os.makedirs(os.path.dirname(os.path.abspath(arguments.output)), exist_ok=True)
+    results.to_csv(arguments.output, mode='a', header=not os.path.exists(arguments.output), index=False)
+    print(f'Appended to {arguments.output}')
+
+if __name__ == '__main__':
+    main()
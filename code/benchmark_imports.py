@@ -0,0 +1,125 @@
+'''
+Measure the import time and memory of the modules with python -X importtime, e.g. from the code directory:
+
+    python benchmark_imports.py --repeats 5 --output ../benchmarks/import_times.csv
+
+Each module is imported in a fresh interpreter. The results are appended to the csv file with the commit and the date,
+so the import times can be tracked across versions.
+'''
+import argparse
+import datetime
+import os
+import platform
+import subprocess
+import sys
+import pandas as pd
+
+# Modules measured by default
+MODULES = ['preprocess', 'dataset', 'extraction_method_1', 'extraction_method_2', 'sweep', 'pipeline', 'run_analysis',
+           'bootstrap', 'placebo', 'local_projections', 'fixed_effects', 'visualisation', 'render']
+
+# Dependencies that data-only runs should not import
+HEAVY_PACKAGES = ['matplotlib', 'seaborn', 'statsmodels', 'scipy.stats', 'tensorflow']
+
+# Peak resident memory of the interpreter in MB, printed by the measured process (ru_maxrss is in kB on Linux)
+MEMORY_SNIPPET = 'import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)'
+
+def measure_import(module, directory):
+    '''
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+    module (str): The module to import, or None for an empty interpreter.
+    directory (str): The directory the interpreter runs in.
+
+    Returns:
+    float: The cumulative import time of the module in seconds.
+    float: The peak resident memory of the interpreter in MB, or NaN where the resource module is not available.
+    list: The heavy packages imported with the module.
+    '''
+    snippet = (f'import {module}\n' if module else '') + f'try:\n    {MEMORY_SNIPPET}\nexcept ImportError:\n    print("nan")'
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', snippet], cwd=directory, capture_output=True, text=True,
+                               check=True)
+
+    # Lines of the form 'import time: self [us] | cumulative | imported package'
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, total, name = line.split('|')
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total) / 1e6
+
+    heavy = [package for package in HEAVY_PACKAGES if package in cumulative]
+    return cumulative.get(module, 0.0 if module is None else float('nan')), float(completed.stdout.split()[-1]), heavy
+
+def benchmark_imports(modules=MODULES, repeats=5, directory=None):
+    '''
+    Measure the import time and memory of modules, keeping the fastest of several imports.
+
+    Args:
+    modules (list, optional): The modules to import. Default is MODULES.
+    repeats (int, optional): The number of imports of each module. Default is 5.
+    directory (str, optional): The directory of the modules. Default is the directory of this file.
+
+    Returns:
+    DataFrame: One row per module, with the import 'seconds', the peak 'rss_mb' of the interpreter (the one of an empty
+    interpreter is in the 'python' row) and the 'heavy' packages it imports.
+    '''
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+
+    rows = []
+    for module in [None] + list(modules):
+        measures = [measure_import(module, directory) for _ in range(repeats)]
+        rows.append({'module': module or 'python',
+                     'seconds': min(seconds for seconds, _, _ in measures),
+                     'rss_mb': min(rss for _, rss, _ in measures),
+                     'heavy': ' '.join(measures[0][2])})
+    return pd.DataFrame(rows)
+
+def current_commit(directory):
+    '''
+    Get the abbreviated hash of the current git commit.
+
+    Args:
+    directory (str): A directory of the repository.
+
+    Returns:
+    str: The hash, followed by '-dirty' when the tracked files have uncommitted changes (the results then belong to no
+    commit), or an empty string outside of a git repository.
+    '''
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True, text=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory, capture_output=True, text=True)
+    except OSError:
+        return ''
+    commit = completed.stdout.strip()
+    return f'{commit}-dirty' if commit and status.stdout.strip() else commit
+
+def main(argv=None):
+    '''
+    Run the benchmark from the command-line arguments and append its results to the output file.
+
+    Args:
+    argv (list, optional): The arguments, without the program name. Default is sys.argv[1:].
+    '''
+    parser = argparse.ArgumentParser(description='Import time and memory of the modules.')
+    parser.add_argument('--modules', nargs='+', default=MODULES, help='Modules to import.')
+    parser.add_argument('--repeats', type=int, default=5, help='Number of imports of each module.')
+    parser.add_argument('--output', default='../benchmarks/import_times.csv', help='CSV file the results are appended to.')
+    arguments = parser.parse_args(argv)
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = benchmark_imports(arguments.modules, arguments.repeats, directory)
+    print(results.to_string(index=False))
+
+    results.insert(0, 'python_version', platform.python_version())
+    results.insert(0, 'commit', current_commit(directory))
+    results.insert(0, 'date', datetime.datetime.now().isoformat(timespec='seconds'))
+
+    os.makedirs(os.path.dirname(os.path.abspath(arguments.output)), exist_ok=True)
+    results.to_csv(arguments.output, mode='a', header=not os.path.exists(arguments.output), index=False)
+    print(f'Appended to {arguments.output}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import warnings
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from patterns import average_pattern, padded_series
+from series import RaggedSeries
+
+def bootstrap_pattern(series, replicates=1000, clusters=None, level=0.9, seed=0, processes=1, batch_size=1000):
+    '''
+    Compute bootstrap percentile bands of the average pattern of series, by resampling the series (crisis events) with replacement.
+
+    Args:
+    series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
+    replicates (int, optional): The number of bootstrap replicates. Default is 1000.
+    clusters (array-like or str, optional): The cluster (e.g. country code) of each series, to resample whole clusters instead
+        of single series, or the column of the events of a RaggedSeries holding it (e.g. 'CC3'). Default is None.
+    level (float, optional): The coverage of the bands. Default is 0.9, i.e. from the 5th to the 95th percentile.
+    seed (int, optional): The seed of the random draws. Default is 0.
+    processes (int, optional): The number of processes sharing the replicates. Default is 1.
+    batch_size (int, optional): The number of replicates computed at once. Default is 1000.
+
+    Returns:
+    DataFrame: A DataFrame with one row per position (ts-1, ts, ts+1, ...) and the following columns:
+        - 'pattern': The average pattern of the series, as in visualisation.compute_pattern.
+        - 'count': The number of data points.
+        - 'lower': The lower percentile of the bootstrap average patterns.
+        - 'upper': The upper percentile of the bootstrap average patterns.
+
+    Each batch of replicates is drawn as a matrix counting how many times each series (or cluster) is drawn in each replicate,
+    so the average patterns of the batch are two matrix products with the padded series. The batches are seeded with children
+    of one SeedSequence, so the bands only depend on the seed and the batch size, not on the number of processes.
+    NaN values are left out of the bootstrap average patterns.
+    '''
+    if isinstance(clusters, str):
+        clusters = series.events[clusters]
+    matrix, mask = padded_series(series)
+    pattern, counts = average_pattern(matrix, mask)
+
+    # Cluster of each series, as integer codes
+    codes = np.arange(len(matrix)) if clusters is None else pd.factorize(np.asarray(clusters))[0]
+
+    sizes = [min(batch_size, replicates - start) for start in range(0, replicates, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # The NaN values are left out of the replicates like the padding
+    valid = mask & ~np.isnan(matrix)
+    arguments = (np.where(valid, matrix, 0), valid.astype(float), codes)
+
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            batches = list(executor.map(_replicate_patterns, *zip(*[arguments + (size, child) for size, child in zip(sizes, seeds)])))
+    else:
+        batches = [_replicate_patterns(*arguments, size, child) for size, child in zip(sizes, seeds)]
+
+    patterns = np.concatenate(batches) if batches else np.full((0, len(pattern)), np.nan)
+    # Positions without data point in any replicate have NaN bands
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        lower, upper = np.nanpercentile(patterns, [50 * (1 - level), 50 * (1 + level)], axis=0)
+
+    return pd.DataFrame({'pattern': pattern, 'count': counts, 'lower': lower, 'upper': upper})
+
+def bootstrap_by_crisis_length(series, crisis_duration, **kwargs):
+    '''
+    Compute bootstrap bands of the average pattern of the series of each crisis length.
+
+    Args:
+    series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
+    crisis_duration (list): A list containing the duration of the crisis of each series.
+    **kwargs: The arguments of bootstrap_pattern. An array of clusters is aligned with the series.
+
+    Returns:
+    dict: The bands from bootstrap_pattern of each crisis length, as drawn by visualisation.plot_all_crisis_length.
+    '''
+    if not isinstance(series, RaggedSeries):
+        series = RaggedSeries.from_lists(series)
+    crisis_duration = np.asarray(crisis_duration)[:len(series)]
+
+    bands = {}
+    for length in np.unique(crisis_duration):
+        selected = crisis_duration == length
+        arguments = dict(kwargs)
+        if arguments.get('clusters') is not None and not isinstance(arguments['clusters'], str):
+            arguments['clusters'] = np.asarray(arguments['clusters'])[:len(series)][selected]
+        bands[int(length)] = bootstrap_pattern(series.select(selected), **arguments)
+    return bands
+
+def _replicate_patterns(values, weights, codes, size, seed):
+    '''
+    Compute the average patterns of a batch of bootstrap replicates.
+
+    Args:
+    values (np.array): The (n_series, max_length) padded series, with 0 as padding.
+    weights (np.array): The (n_series, max_length) mask of the values of the series, as floats.
+    codes (np.array): The cluster code of each series.
+    size (int): The number of replicates of the batch.
+    seed (SeedSequence): The seed of the batch.
+
+    Returns:
+    np.array: A (size, max_length) array with the average pattern of each replicate, NaN where a replicate has no data point.
+    '''
+    rng = np.random.default_rng(seed)
+    clusters = codes.max() + 1 if len(codes) else 0
+
+    # Number of times each cluster is drawn in each replicate, spread to the series of the clusters
+    draws = rng.multinomial(clusters, np.full(clusters, 1 / clusters), size=size) if clusters else np.zeros((size, 0))
+    draws = draws[:, codes].astype(float)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (draws @ values) / (draws @ weights)
@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import numpy as np
+import pandas as pd
+import dataset
+import hp_filter
+import preprocess
+
+DEFAULT_CACHE_DIR = '../cache'
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+# The cached stages are invalidated whenever the code producing them changes
+SOURCE_FILES = [preprocess.__file__, dataset.__file__, hp_filter.__file__]
+
+def file_digest(path):
+    '''
+    Compute the SHA-256 digest of the content of a file.
+
+    Args:
+    path (str): The path of the file.
+
+    Returns:
+    str: The hexadecimal digest of the file.
+    '''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(stage, *parts):
+    '''
+    Compute the key of a cached stage from everything its output depends on.
+
+    Args:
+    stage (str): The name of the stage.
+    *parts: The digests of the input files and the parameters of the stage.
+
+    Returns:
+    str: The hexadecimal key of the stage.
+    '''
+    sources = [file_digest(path) for path in SOURCE_FILES]
+    return hashlib.sha256(json.dumps([stage, sources, *parts], default=str).encode()).hexdigest()
+
+def save_frame(df, directory):
+    '''
+    Save a dataframe in a columnar binary format, with one .npy file per column.
+
+    Args:
+    df (DataFrame): The dataframe to save.
+    directory (str): The directory where the columns are written. It is replaced atomically.
+
+    Numeric and boolean columns are stored as they are, nullable columns with a mask, and categorical or text columns
+    as integer codes with their categories. The object columns holding other values than strings (e.g. [1, 'x', None])
+    are pickled, so that they are loaded back unchanged.
+    '''
+    temporary = f'{directory}.tmp{os.getpid()}'
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    columns = [_save_column(df[name], os.path.join(temporary, str(i))) for i, name in enumerate(df.columns)]
+    for column, name in zip(columns, df.columns):
+        column['name'] = name
+
+    # Keep the index unless it is the default one
+    index = None
+    if not df.index.equals(pd.RangeIndex(len(df))):
+        index = _save_column(df.index.to_series(), os.path.join(temporary, 'index'))
+
+    with open(os.path.join(temporary, 'meta.json'), 'w') as file:
+        json.dump({'rows': len(df), 'columns': columns, 'index': index}, file)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+
+def load_frame(directory, mmap=True):
+    '''
+    Load a dataframe saved by save_frame.
+
+    Args:
+    directory (str): The directory where the columns were written.
+    mmap (bool, optional): True to memory-map the column files instead of reading them. Default is True.
+
+    Returns:
+    DataFrame: The loaded dataframe.
+
+    The numeric and boolean columns of the dataframe are the memory-mapped arrays themselves, one block per column, so a
+    warm load reads nothing until the values are used. They are opened in copy-on-write mode, so the dataframe can be
+    modified without altering the cache. The other columns are decoded in memory.
+    '''
+    with open(os.path.join(directory, 'meta.json')) as file:
+        meta = json.load(file)
+
+    mmap_mode = 'c' if mmap else None
+    data = {column['name']: _load_column(column, os.path.join(directory, str(i)), mmap_mode)
+            for i, column in enumerate(meta['columns'])}
+    # copy=False keeps the memory-mapped arrays instead of consolidating the columns of the same dtype in a copy
+    df = pd.DataFrame(data, columns=[column['name'] for column in meta['columns']], copy=False)
+    if len(meta['columns']) == 0:
+        df = pd.DataFrame(index=pd.RangeIndex(meta['rows']))
+
+    if meta['index'] is not None:
+        df.index = pd.Index(_load_column(meta['index'], os.path.join(directory, 'index'), mmap_mode))
+
+    return df
+
+def save_output(output, directory):
+    '''
+    Save the output of a stage, a dataframe with save_frame and any other object with pickle.
+
+    Args:
+    output (object): The output to save.
+    directory (str): The directory where the output is written. It is replaced atomically.
+    '''
+    if isinstance(output, pd.DataFrame):
+        save_frame(output, directory)
+        return
+
+    temporary = f'{directory}.tmp{os.getpid()}'
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    with open(os.path.join(temporary, 'object.pkl'), 'wb') as file:
+        pickle.dump(output, file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(temporary, 'meta.json'), 'w') as file:
+        json.dump({'kind': 'pickle'}, file)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+
+def load_output(directory):
+    '''
+    Load the output of a stage saved by save_output.
+
+    Args:
+    directory (str): The directory where the output was written.
+
+    Returns:
+    object: The loaded output.
+    '''
+    with open(os.path.join(directory, 'meta.json')) as file:
+        meta = json.load(file)
+
+    if meta.get('kind') == 'pickle':
+        with open(os.path.join(directory, 'object.pkl'), 'rb') as file:
+            return pickle.load(file)
+    return load_frame(directory)
+
+def cached(stage, key, compute, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    '''
+    Return the cached output of a stage, computing and caching it if it is missing.
+
+    Args:
+    stage (str): The name of the stage.
+    key (str): The key of the stage, from cache_key.
+    compute (function): A function without arguments returning the dataframe of the stage.
+    cache_dir (str, optional): The directory of the cache. Default is DEFAULT_CACHE_DIR.
+    max_bytes (int, optional): The maximum size of the cache. The least recently used entries are evicted beyond it. Default is 512 MB.
+
+    Returns:
+    DataFrame: The output of the stage.
+    '''
+    directory = os.path.join(cache_dir, f'{stage}-{key}')
+    meta_path = os.path.join(directory, 'meta.json')
+
+    if os.path.exists(meta_path):
+        # Record the access for the eviction policy
+        os.utime(meta_path)
+        return load_frame(directory)
+
+    df = compute()
+    os.makedirs(cache_dir, exist_ok=True)
+    save_frame(df, directory)
+    evict(cache_dir, max_bytes, keep=directory)
+
+    return df
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, keep=None):
+    '''
+    Remove the least recently used entries of the cache until its size is below max_bytes.
+
+    Args:
+    cache_dir (str, optional): The directory of the cache. Default is DEFAULT_CACHE_DIR.
+    max_bytes (int, optional): The maximum size of the cache. Default is 512 MB.
+    keep (str, optional): An entry that must not be removed, e.g. the one that was just written.
+    '''
+    entries = []
+    for name in os.listdir(cache_dir):
+        directory = os.path.join(cache_dir, name)
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            continue
+        size = sum(entry.stat().st_size for entry in os.scandir(directory))
+        entries.append((os.path.getmtime(meta_path), size, directory))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, directory in sorted(entries):
+        if total <= max_bytes:
+            break
+        if directory == keep:
+            continue
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+
+def load_panel(global_crises_path, maddison_path, country_list, how, smoothing_param=6.25, compact=False,
+               cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    '''
+    Load the panel of a list of countries, with its dummy variables, from the raw datasets through the cache.
+
+    Args:
+    global_crises_path (str): The path of the Global Crises dataset.
+    maddison_path (str): The path of the Maddison GDP per capita dataset.
+    country_list (list): List of country codes to include in the panel.
+    how (str): Type of merge to be performed ('left' or 'inner').
+    smoothing_param (int, optional): The smoothing parameter for the Hodrick-Prescott filter. Default is 6.25.
+    compact (bool, optional): True to cache and return the compact panel of dataset.compact_panel. Default is False.
+    cache_dir (str, optional): The directory of the cache. Default is DEFAULT_CACHE_DIR.
+    max_bytes (int, optional): The maximum size of the cache. Default is 512 MB.
+
+    Returns:
+    DataFrame: The same panel as concat_dataset followed by dummy_variable.
+
+    The preprocessed datasets and the panel are cached separately, keyed by the content of the raw files,
+    the parameters and the code of the pipeline, so that any change invalidates the stages depending on it.
+    '''
+    crises_digest = file_digest(global_crises_path)
+    maddison_digest = file_digest(maddison_path)
+
+    def preprocessed_crises():
+        main_data = pd.read_csv(global_crises_path, encoding='unicode_escape')
+        preprocess.preprocess_global_crises_data(main_data)
+        return main_data
+
+    def preprocessed_maddison():
+        GDP_pc = pd.read_csv(maddison_path)
+        preprocess.preprocess_mdp_data(GDP_pc)
+        return GDP_pc
+
+    def panel():
+        main_data = cached('crises', cache_key('crises', crises_digest), preprocessed_crises, cache_dir, max_bytes)
+        GDP_pc = cached('maddison', cache_key('maddison', maddison_digest), preprocessed_maddison, cache_dir, max_bytes)
+        data = dataset.concat_dataset(main_data, GDP_pc, country_list, how, smoothing_param)
+        dataset.dummy_variable(data)
+        if compact:
+            return dataset.compact_panel(data)
+        return data
+
+    key = cache_key('panel', crises_digest, maddison_digest, list(country_list), how, float(smoothing_param), compact)
+    return cached('panel', key, panel, cache_dir, max_bytes)
+
+def _save_column(series, path):
+    '''
+    Save a column of a dataframe and describe how to load it back.
+
+    Args:
+    series (Series): The column to save.
+    path (str): The path prefix of the files of the column.
+
+    Returns:
+    dict: The description of the column.
+    '''
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        np.save(f'{path}.npy', series.cat.codes.to_numpy())
+        return {'kind': 'categorical', 'dtype': str(dtype), 'ordered': bool(dtype.ordered),
+                'categories': _save_column(pd.Series(series.cat.categories), f'{path}.categories')}
+
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        if isinstance(dtype, np.dtype):
+            np.save(f'{path}.npy', series.to_numpy())
+            return {'kind': 'numpy', 'dtype': str(dtype)}
+        # Nullable columns are stored as their values and their mask of missing values
+        mask = series.isna().to_numpy()
+        np.save(f'{path}.npy', series.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        np.save(f'{path}.mask.npy', mask)
+        return {'kind': 'masked', 'dtype': str(dtype)}
+
+    if pd.api.types.is_datetime64_dtype(dtype):
+        np.save(f'{path}.npy', series.to_numpy())
+        return {'kind': 'numpy', 'dtype': str(dtype)}
+
+    # Text columns are stored as codes of their distinct values
+    codes, uniques = pd.factorize(series)
+    if all(isinstance(value, str) for value in uniques):
+        np.save(f'{path}.npy', codes)
+        np.save(f'{path}.uniques.npy', np.asarray(uniques, dtype=str))
+        return {'kind': 'text', 'dtype': str(dtype)}
+
+    # Other object columns would be turned into strings, so they are pickled
+    with open(f'{path}.pkl', 'wb') as file:
+        pickle.dump(series.array, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return {'kind': 'pickle', 'dtype': str(dtype)}
+
+def _load_column(column, path, mmap_mode):
+    '''
+    Load a column saved by _save_column.
+
+    Args:
+    column (dict): The description of the column.
+    path (str): The path prefix of the files of the column.
+    mmap_mode (str): The memory-map mode passed to np.load, or None to read the file.
+
+    Returns:
+    array-like: The values of the column.
+    '''
+    if column['kind'] == 'pickle':
+        with open(f'{path}.pkl', 'rb') as file:
+            return pickle.load(file)
+
+    values = np.load(f'{path}.npy', mmap_mode=mmap_mode)
+    if isinstance(values, np.memmap):
+        # A plain array viewing the mapped memory, as the memmap subclass would leak into the results of the operations
+        values = values.view(np.ndarray)
+
+    if column['kind'] == 'numpy':
+        return values
+
+    if column['kind'] == 'masked':
+        array = pd.array(values, dtype=column['dtype'])
+        array[np.load(f'{path}.mask.npy')] = pd.NA
+        return array
+
+    if column['kind'] == 'categorical':
+        categories = _load_column(column['categories'], f'{path}.categories', None)
+        return pd.Categorical.from_codes(values, categories=categories, ordered=column['ordered'])
+
+    # Text columns, with NaN for the missing values as when reading a csv file
+    uniques = np.load(f'{path}.uniques.npy').astype(object)
+    text = np.full(len(values), np.nan, dtype=object)
+    text[values >= 0] = uniques[values[values >= 0]]
+    if column['dtype'] == 'object':
+        return text
+    return pd.array(text, dtype=column['dtype'])
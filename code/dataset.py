@@ -1,6 +1,19 @@
 import pandas as pd
-import statsmodels.api as sm
 import numpy as np
+from hp_filter import hp_trend, hp_trend_groups, hp_trend_sweep
+
+# Types of the columns kept in a compact panel. The output gap columns of a smoothing parameter sweep are kept as float32 too.
+COMPACT_PANEL_SCHEMA = {'CC3':'category',
+                        'Year':'int16',
+                        'banking_crisis':'int8',
+                        'currency_crisis':'int8',
+                        'inflation_crisis':'int8',
+                        'annual_inflation':'float32',
+                        'output_gap':'float32',
+                        'banking_crisis_only':'int8',
+                        'excluded_years':'int8',
+                        'banking_crisis_only_first_year':'int8',
+                        'recovery_only':'int8'}
 
 def create_output_df(data, code, smoothing_param=6.25):
     '''Create a dataframe with the Hodrick-Prescott detrended output gap for a specific country code.
@@ -24,7 +37,7 @@ def create_output_df(data, code, smoothing_param=6.25):
     df = data.loc[data['Code'] == code]
 
     # Apply Hodrick-Prescott filter to detrend GDP per capita
-    cycle, trend = sm.tsa.filters.hpfilter(df.GDP_per_capita, lamb=smoothing_param)
+    trend = pd.Series(hp_trend(df.GDP_per_capita, smoothing_param), index=df.index)
 
     # Calculate output gap
     output_gap = round(((df.GDP_per_capita - trend) / trend) * 100, 2)
@@ -38,6 +51,83 @@ def create_output_df(data, code, smoothing_param=6.25):
 
     return output_df
 
+def create_output_panel(data, smoothing_param=6.25):
+    '''Create a dataframe with the Hodrick-Prescott detrended output gap of every country of the dataset.
+
+    Args:
+    data (DataFrame): The dataset containing GDP per capita information.
+    smoothing_param (int, optional): The smoothing parameter for the Hodrick-Prescott filter. Default is 6.25.
+
+    Returns:
+    DataFrame: DataFrame containing the output gap of every country, with the same values as create_output_df.
+
+    Rows without a country code (regions and aggregates) are left out. The countries sharing the same number of years
+    are detrended together, with a factorization of the filter that is cached between calls.
+    '''
+
+    # Keep only the rows of the countries
+    df = data.loc[data['Code'].notna()]
+
+    # Apply Hodrick-Prescott filter to detrend GDP per capita of every country at once
+    trend = pd.Series(hp_trend_groups(df.GDP_per_capita, df.Code, smoothing_param), index=df.index)
+
+    # Calculate output gap
+    output_gap = round(((df.GDP_per_capita - trend) / trend) * 100, 2)
+
+    # Create output DataFrame
+    output_df = pd.DataFrame({
+        'CC3': df.Code,
+        'Year': df.Year,
+        'output_gap': output_gap
+    })
+
+    return output_df
+
+def create_output_sweep(data, smoothing_params):
+    '''Create a dataframe with the Hodrick-Prescott detrended output gap of every country for several smoothing parameters.
+
+    Args:
+    data (DataFrame): The dataset containing GDP per capita information.
+    smoothing_params (list): The smoothing parameters for the Hodrick-Prescott filter.
+
+    Returns:
+    DataFrame: DataFrame containing one output gap column per smoothing parameter, named output_gap_{smoothing_param}.
+
+    Each column holds the same values as create_output_panel with the corresponding smoothing parameter.
+    The grouping of the countries is shared by the whole sweep and the factorization of the filter is cached
+    for each series length and smoothing parameter.
+    '''
+
+    # Keep only the rows of the countries
+    df = data.loc[data['Code'].notna()]
+
+    # Apply Hodrick-Prescott filter to detrend GDP per capita of every country for every smoothing parameter
+    trends = hp_trend_sweep(df.GDP_per_capita, df.Code, smoothing_params)
+
+    # Create output DataFrame
+    output_df = pd.DataFrame({
+        'CC3': df.Code,
+        'Year': df.Year
+    })
+
+    # Calculate the output gap for each smoothing parameter
+    for j, smoothing_param in enumerate(smoothing_params):
+        trend = pd.Series(trends[:, j], index=df.index)
+        output_df[output_gap_column(smoothing_param)] = round(((df.GDP_per_capita - trend) / trend) * 100, 2)
+
+    return output_df
+
+def output_gap_column(smoothing_param):
+    '''Name of the output gap column of a smoothing parameter in a sweep, e.g. output_gap_6.25 or output_gap_1600.
+
+    Args:
+    smoothing_param (float): The smoothing parameter for the Hodrick-Prescott filter.
+
+    Returns:
+    str: The name of the column.
+    '''
+    return f'output_gap_{smoothing_param:g}'
+
 def merge_datasets(dataset1, dataset2, on=['Year', 'CC3'], how='left'):
     '''Merge two datasets based on specified columns.
 
@@ -66,14 +156,47 @@ def concat_dataset(dataset1, dataset2, list, how, smoothing_param=6.25):
     Returns:
     DataFrame: Concatenated DataFrame.
     '''
-    all_datasets = []
-    for code in list:
-        # Merge datasets for each country code
-        df = merge_datasets(dataset1[dataset1["CC3"]==code], create_output_df(dataset2, code, smoothing_param), how = how)
-        all_datasets.append(df)
+    # Compute the output gap of all the selected countries at once
+    output_df = create_output_panel(dataset2[dataset2['Code'].isin(list)], smoothing_param)
+
+    return merge_countries(dataset1, output_df, list, how)
+
+def concat_dataset_sweep(dataset1, dataset2, list, how, smoothing_params):
+    '''Concatenate datasets for multiple countries with the output gap of several smoothing parameters.
 
-    # Concatenate all datasets
-    concat_dataset = pd.concat(all_datasets,ignore_index=True)
+    Args:
+    dataset1 (DataFrame): The first dataset to concatenate.
+    dataset2 (DataFrame): The second dataset to concatenate.
+    country_list (list): List of country codes to include in the concatenated dataset.
+    how (str, optional): Type of concatenation to be performed. Defaults to 'left'.
+    smoothing_params (list): The smoothing parameters for the Hodrick-Prescott filter.
+
+    Returns:
+    DataFrame: Concatenated DataFrame, with one output_gap_{smoothing_param} column per smoothing parameter instead of output_gap.
+    '''
+    # Compute the output gaps of all the selected countries at once
+    output_df = create_output_sweep(dataset2[dataset2['Code'].isin(list)], smoothing_params)
+
+    return merge_countries(dataset1, output_df, list, how)
+
+def merge_countries(dataset1, output_df, list, how):
+    '''Merge the output gaps with the dataset of the selected countries, ordering the countries as in the list.
+
+    Args:
+    dataset1 (DataFrame): The dataset containing the crisis information.
+    output_df (DataFrame): The dataset containing the output gaps.
+    country_list (list): List of country codes to include in the merged dataset.
+    how (str): Type of merge to be performed.
+
+    Returns:
+    DataFrame: Merged DataFrame.
+    '''
+    # Merge the datasets of all the selected countries at once
+    concat_dataset = merge_datasets(dataset1[dataset1['CC3'].isin(list)], output_df, how = how)
+
+    # Order the countries as in the list, keeping the order of the years of each country
+    country_position = pd.Index(list).unique().get_indexer(concat_dataset['CC3'])
+    concat_dataset = concat_dataset.iloc[np.argsort(country_position, kind='stable')].reset_index(drop=True)
 
     return concat_dataset
 
@@ -92,40 +215,72 @@ def dummy_variable(dataset):
     '''
 
     # Generate a boolean mask where True indicates non-NaN values
-    not_nan_mask = ~np.isnan(dataset['annual_inflation'])
+    not_nan_mask = dataset['annual_inflation'].notna()
+
+    # Missing crisis flags are not crises
+    banking_crisis = dataset['banking_crisis'].fillna(0) == 1
+    inflation_crisis = dataset['inflation_crisis'].fillna(0) == 1
+    currency_crisis = dataset['currency_crisis'].fillna(0) == 1
 
     # Creating a dummy for the years with a banking crisis and no inflation crisis
-    dataset['banking_crisis_only'] = ((dataset['banking_crisis'] == 1) &
-                                        (dataset['inflation_crisis'] != 1) &
-                                        (dataset['currency_crisis'] != 1) &
+    dataset['banking_crisis_only'] = (banking_crisis &
+                                        ~inflation_crisis &
+                                        ~currency_crisis &
                                         not_nan_mask )
     dataset['banking_crisis_only'] = dataset['banking_crisis_only'].astype(int)
 
     #Create a dummy variable for excluded years
-    dataset['excluded_years'] = ((dataset['inflation_crisis'] == 1) | (dataset['currency_crisis'] == 1)).astype(int)
+    dataset['excluded_years'] = (inflation_crisis | currency_crisis).astype(int)
 
     # Creating a dummy for the first years of crisis
-    dataset['banking_crisis_only_first_year'] = 0
-    last_crisis_year = None
-    previous_year_exlcuded = None
-    previous_year_inflation_is_nan = None
-
-    for index, row in dataset.iterrows():
-        if row['banking_crisis'] == 1:
-            if row['banking_crisis_only'] == 1 and previous_year_exlcuded != 1 and not previous_year_inflation_is_nan :
-                if last_crisis_year is None:
-                    dataset.at[index, 'banking_crisis_only_first_year'] = 1
-                if ((last_crisis_year is not None and row['Year'] - last_crisis_year >= 2) or (last_crisis_year is not None and row['Year'] - last_crisis_year <0)):
-                    dataset.at[index, 'banking_crisis_only_first_year'] = 1
-            last_crisis_year = row['Year']
-        previous_year_exlcuded = row['excluded_years']
-        previous_year_inflation_is_nan = np.isnan(row['annual_inflation'])
+    # Each row is compared with the previous row of the same country, so that the flags never leak across country boundaries
+    countries = dataset.groupby('CC3', sort=False)
+    has_previous_year = countries.cumcount() > 0
+    previous_year_excluded = countries['excluded_years'].shift() == 1
+    previous_year_inflation_is_nan = has_previous_year & countries['annual_inflation'].shift().isna()
+
+    # Year of the last banking crisis recorded for the country before each row (NaN if there is none)
+    last_crisis_year = dataset['Year'].where(banking_crisis).groupby(dataset['CC3'], sort=False).shift()
+    last_crisis_year = last_crisis_year.groupby(dataset['CC3'], sort=False).ffill()
+    years_since_last_crisis = dataset['Year'] - last_crisis_year
+
+    dataset['banking_crisis_only_first_year'] = (banking_crisis &
+                                                 (dataset['banking_crisis_only'] == 1) &
+                                                 ~previous_year_excluded &
+                                                 ~previous_year_inflation_is_nan &
+                                                 (last_crisis_year.isna() | (years_since_last_crisis >= 2) | (years_since_last_crisis < 0)))
+    dataset['banking_crisis_only_first_year'] = dataset['banking_crisis_only_first_year'].astype(int)
 
     #Create a dummy for recovery period
-    dataset['recovery_only'] = ((dataset['banking_crisis'] != 1) &
-                                    (dataset['inflation_crisis'] != 1) &
-                                    (dataset['currency_crisis'] != 1) &
+    dataset['recovery_only'] = (~banking_crisis &
+                                    ~inflation_crisis &
+                                    ~currency_crisis &
                                     not_nan_mask)
     dataset['recovery_only'] = dataset['recovery_only'].astype(int)
 
     return
+
+def compact_panel(dataset):
+    '''
+    Create a compact copy of a panel built by concat_dataset and dummy_variable.
+
+    Args:
+    - dataset (DataFrame): The dataset containing various the informations for a list of countries.
+
+    Returns:
+    - DataFrame: The panel restricted to the columns of COMPACT_PANEL_SCHEMA (and output_gap_* columns), with their compact types.
+
+    The country codes become categorical, the years int16, the flags and dummies int8 (missing flags become 0, as they are
+    never a crisis) and the measures float32. The other columns (notes, sovereign debt, ...) are dropped.
+    The extraction functions accept the compact panel as they accept the full one.
+    '''
+    schema = {column: dtype for column, dtype in COMPACT_PANEL_SCHEMA.items() if column in dataset.columns}
+    schema.update({column: 'float32' for column in dataset.columns if column.startswith('output_gap_')})
+
+    compact = dataset[list(schema)].copy()
+
+    # Missing crisis flags are not crises
+    flags = [column for column in schema if schema[column] == 'int8']
+    compact[flags] = compact[flags].fillna(0)
+
+    return compact.astype(schema)
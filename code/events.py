@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+def crisis_events(data):
+    '''
+    Build the index of the banking crisis events of a panel, with one row per first year of banking crisis.
+
+    Args:
+    data (DataFrame): The dataset created by concat_dataset and dummy_variable, with the rows of each country following each other.
+
+    Returns:
+    DataFrame: A DataFrame with one row per crisis event and the following columns:
+        - 'CC3': The country code of the crisis.
+        - 'start': The row position of the first year of the crisis (ts).
+        - 'end': The row position of the last year of the crisis, i.e. the last of the banking crisis years following ts.
+        - 'start_year': The year of ts.
+        - 'duration': The number of years from start to end.
+        - 'excluded_inside': 1 if an excluded year occurs between start and end, otherwise 0.
+        - 'next_crisis': The row position of the next first year of a crisis of the same country, or country_end if there is none.
+        - 'recovery_end': The row position of the next banking crisis year of the same country after end, or country_end if there is none.
+          The recovery period of the crisis spans the rows between end and recovery_end.
+        - 'country_start': The row position of the first row of the country.
+        - 'country_end': The row position following the last row of the country.
+
+    The index is computed once with vectorized run-length encoding, and the rows of a country never extend to another country.
+    '''
+    arrays = panel_arrays(data)
+    n = len(data)
+    country_start, country_end = country_bounds(data)
+
+    start = np.flatnonzero(arrays['banking_crisis_only_first_year'])
+
+    # A crisis continues with the banking crisis years that are not the first year of another crisis, until the country ends
+    continues = arrays['banking_crisis'] & ~arrays['banking_crisis_only_first_year']
+    end = next_true(~continues | (country_start == np.arange(n)), start + 1) - 1
+
+    # Next first year and next banking crisis year of the same country
+    next_crisis = np.minimum(next_true(arrays['banking_crisis_only_first_year'], start + 1), country_end[start])
+    recovery_end = np.minimum(next_true(arrays['banking_crisis'], end + 1), country_end[start])
+
+    excluded_years = np.concatenate(([0], np.cumsum(arrays['excluded_years'])))
+
+    return pd.DataFrame({
+        'CC3': np.asarray(data['CC3'])[start],
+        'start': start,
+        'end': end,
+        'start_year': np.asarray(data['Year'])[start],
+        'duration': end - start + 1,
+        'excluded_inside': (excluded_years[end + 1] - excluded_years[start] > 0).astype(int),
+        'next_crisis': next_crisis,
+        'recovery_end': recovery_end,
+        'country_start': country_start[start],
+        'country_end': country_end[start],
+    })
+
+def panel_arrays(data):
+    '''
+    Extract the columns of a panel used by the extraction functions as NumPy arrays.
+
+    Args:
+    data (DataFrame): The dataset created by concat_dataset and dummy_variable.
+
+    Returns:
+    dict: The crisis flags and dummies as boolean arrays (missing flags are not crises), and the available measures
+    ('annual_inflation', 'output_gap', 'Year') as float arrays with NaN for the missing values.
+    '''
+    flags = ['banking_crisis', 'inflation_crisis', 'currency_crisis',
+             'banking_crisis_only', 'excluded_years', 'banking_crisis_only_first_year', 'recovery_only']
+
+    arrays = {column: data[column].to_numpy(dtype=float, na_value=np.nan) == 1 for column in flags}
+    for column in ['annual_inflation', 'output_gap', 'Year']:
+        if column in data.columns:
+            arrays[column] = data[column].to_numpy(dtype=float, na_value=np.nan)
+
+    return arrays
+
+def column_array(data, arrays, column):
+    '''
+    Get a column of a panel as a float array, from the arrays of panel_arrays when it is one of them.
+
+    Args:
+    data (DataFrame): The dataset.
+    arrays (dict): The arrays of the dataset from panel_arrays.
+    column (str): The column.
+
+    Returns:
+    np.array: The values of the column, with NaN for the missing values.
+    '''
+    if column in arrays:
+        return arrays[column]
+    return data[column].to_numpy(dtype=float, na_value=np.nan)
+
+def country_bounds(data):
+    '''
+    Compute the bounds of the rows of the country of each row.
+
+    Args:
+    data (DataFrame): A dataset with a 'CC3' column, with the rows of each country following each other.
+
+    Returns:
+    np.array: The row position of the first row of the country of each row.
+    np.array: The row position following the last row of the country of each row.
+    '''
+    n = len(data)
+    codes = pd.factorize(np.asarray(data['CC3']))[0]
+    new_country = np.ones(n, dtype=bool)
+    new_country[1:] = codes[1:] != codes[:-1]
+
+    positions = np.arange(n)
+    country_start = np.maximum.accumulate(np.where(new_country, positions, 0)) if n else positions
+    country_end = next_true(new_country, positions + 1)
+
+    return country_start, country_end
+
+def next_true(mask, positions):
+    '''
+    Find the first True value of a mask at or after each of the given positions.
+
+    Args:
+    mask (np.array): A boolean array.
+    positions (np.array): Row positions, between 0 and len(mask).
+
+    Returns:
+    np.array: For each position, the position of the first True value at or after it, or len(mask) if there is none.
+    '''
+    n = len(mask)
+    following = np.append(np.where(mask, np.arange(n), n), n)
+    following = np.minimum.accumulate(following[::-1])[::-1]
+    return following[positions]
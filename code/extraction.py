@@ -0,0 +1,401 @@
+import numpy as np
+from dataclasses import dataclass, field
+from events import column_array, crisis_events, next_true, panel_arrays
+from series import RaggedSeries
+from windows import gather_windows, window_rows, windows_to_series
+
+@dataclass(frozen=True)
+class VariableRule:
+    '''
+    The boundary conditions of the series of one column.
+
+    Attributes:
+    nan_column (str): A column whose NaN values contaminate the windows around ts like an excluded year, or None.
+    check_years (bool): True to stop the windows around ts at the first missing year of the country.
+    previous_year (bool): True to drop the windows around ts that have no year ts-1 in the country.
+    crisis_column (str): The column marking the years of the crisis periods in the crisis dynamics.
+    skipped_nan_column (str): A column whose NaN values are skipped by the crisis and recovery dynamics, or None.
+    '''
+    nan_column: str = None
+    check_years: bool = False
+    previous_year: bool = False
+    crisis_column: str = 'banking_crisis'
+    skipped_nan_column: str = None
+
+@dataclass(frozen=True)
+class Policy:
+    '''
+    The rules of an extraction method (see documentation/Extraction_methods.txt).
+
+    Attributes:
+    excluded (str): 'cut' to stop a series at its first excluded year, 'drop' to remove the series containing one.
+    contaminated_recovery (bool): True to leave out the recovery period following a crisis period containing an excluded year.
+    horizon (int): The number of years extracted after the first year of each crisis (ts) by extract_series.
+    variables (dict): The VariableRule of each column. The other columns skip their own NaN values.
+    '''
+    excluded: str = 'cut'
+    contaminated_recovery: bool = False
+    horizon: int = 8
+    variables: dict = field(default_factory=dict)
+
+    def rule(self, column):
+        '''
+        Return the VariableRule of a column.
+
+        Args:
+        column (str): The column to extract.
+
+        Returns:
+        VariableRule: The rule of the column in the policy.
+        '''
+        return self.variables.get(column, VariableRule(skipped_nan_column=column))
+
+# First method: excluded years cut the series, and recovery periods are kept whatever happened during the crisis
+METHOD_1 = Policy(
+    excluded='cut',
+    contaminated_recovery=False,
+    variables={
+        'annual_inflation': VariableRule(nan_column='annual_inflation', previous_year=True, skipped_nan_column='annual_inflation'),
+        'output_gap': VariableRule(check_years=True, crisis_column='banking_crisis_only'),
+    },
+)
+
+# Second method: the series containing an excluded year are dropped, as well as the recovery periods of contaminated crises
+METHOD_2 = Policy(
+    excluded='drop',
+    contaminated_recovery=True,
+    variables={
+        'annual_inflation': VariableRule(nan_column='annual_inflation', skipped_nan_column='annual_inflation'),
+        'output_gap': VariableRule(nan_column='annual_inflation', check_years=True, skipped_nan_column='output_gap'),
+    },
+)
+
+def extract_series(data, column, policy, events=None, ragged=False, arrays=None):
+    '''
+    Extract the series of a column from the year before each first year of crisis (ts-1) to ts+horizon.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    column (str): The column to extract.
+    policy (Policy): The extraction method, e.g. METHOD_1 or METHOD_2.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    ragged (bool, optional): True to return a RaggedSeries carrying the events of the series. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    list: A list of lists, where each sublist represents the series of a crisis event.
+
+    The series stop at another crisis or at the end of the country. Excluded years, and NaN values of the nan_column of the
+    rule of the column, cut or drop the series depending on the policy.
+    '''
+    if events is None:
+        events = crisis_events(data)
+    if arrays is None:
+        arrays = panel_arrays(data)
+
+    rows, valid, kept = series_rows(data, policy, policy.rule(column), events, arrays)
+    return windows_to_series(gather_windows(column_array(data, arrays, column), rows), valid, kept, events, ragged)
+
+def dynamics(data, column, policy, during_crisis=True, events=None, ragged=False, arrays=None):
+    '''
+    Extract the series of a column for each banking crisis or recovery period.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    column (str): The column to extract.
+    policy (Policy): The extraction method, e.g. METHOD_1 or METHOD_2.
+    during_crisis (bool, optional): True to extract series for each banking crisis, False for recovery periods. Default is True.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    ragged (bool, optional): True to return a RaggedSeries. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    list: A list of lists, where each sublist represents a series of values of the column.
+    '''
+    if during_crisis:
+        return crisis_dynamics(data, column, policy, events, ragged, arrays)
+    return recovery_dynamics(data, column, policy, events, ragged, arrays)
+
+def crisis_dynamics(data, column, policy, events=None, ragged=False, arrays=None):
+    '''
+    Extract the series of a column for each banking crisis, from the year before the crisis starts (ts-1) until the crisis ends.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    column (str): The column to extract.
+    policy (Policy): The extraction method, e.g. METHOD_1 or METHOD_2.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    ragged (bool, optional): True to return a RaggedSeries carrying the events of the series. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    list: A list of lists, where each sublist represents a series of values of the column.
+
+    A serie is only extracted for the crisis periods beginning with a first year of banking crisis that has a year before it in the country.
+    It runs over the years of the crisis_column of the rule of the column, skipping the years with a NaN value in its skipped_nan_column,
+    and a year of the period that is not a banking crisis only year (an excluded year) cuts or drops the serie depending on the policy.
+    '''
+    if events is None:
+        events = crisis_events(data)
+    if arrays is None:
+        arrays = panel_arrays(data)
+
+    rows, offsets, selected = _crisis_rows(data, policy, policy.rule(column), events, arrays)
+    series = RaggedSeries(column_array(data, arrays, column)[rows], offsets, events[selected].reset_index(drop=True))
+    return series if ragged else series.to_lists()
+
+def recovery_dynamics(data, column, policy, events=None, ragged=False, arrays=None):
+    '''
+    Extract the series of a column for each recovery period following a banking crisis.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    column (str): The column to extract.
+    policy (Policy): The extraction method, e.g. METHOD_1 or METHOD_2.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    ragged (bool, optional): True to return a RaggedSeries. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    list: A list of lists, where each sublist represents a series of values of the column.
+
+    Each series spans from the year after the crisis ends to the year before the next crisis starts but stops if an excluded year occurs.
+    With contaminated_recovery, the recovery serie is not appended if an inflation/currency crisis occured during the previous banking crisis.
+    Only the recovery periods following a first year of banking crisis of the country are extracted.
+    '''
+    if events is None:
+        events = crisis_events(data)
+    if arrays is None:
+        arrays = panel_arrays(data)
+
+    rows, offsets = _recovery_rows(data, policy, policy.rule(column), events, arrays)
+    series = RaggedSeries(column_array(data, arrays, column)[rows], offsets)
+    return series if ragged else series.to_lists()
+
+def extract_variables(data, columns, policy, events=None, ragged=False):
+    '''
+    Extract the series around ts and the crisis and recovery dynamics of several columns at once.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    columns (list): The columns to extract, e.g. ['annual_inflation', 'output_gap', 'GDP_per_capita'].
+    policy (Policy): The extraction method, e.g. METHOD_1 or METHOD_2.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    ragged (bool, optional): True to return RaggedSeries carrying the events of the series. Default is False.
+
+    Returns:
+    dict: For each column, a dict with the same series as the following functions:
+        - 'series': extract_series.
+        - 'crisis': crisis_dynamics.
+        - 'recovery': recovery_dynamics.
+
+    The event index and the panel arrays are built once, and the rows of the series are located once for all the columns
+    sharing the same rule, so each additional column only costs the gathering of its values. Each column keeps the NaN
+    handling of its own rule in the policy.
+    '''
+    if events is None:
+        events = crisis_events(data)
+    arrays = panel_arrays(data)
+
+    # Rows of the series, by the settings of the rules they depend on
+    windows_by_rule, crisis_by_rule, recovery_by_rule = {}, {}, {}
+
+    extracted = {}
+    for column in columns:
+        rule = policy.rule(column)
+        values = column_array(data, arrays, column)
+
+        key = (rule.nan_column, rule.check_years, rule.previous_year)
+        if key not in windows_by_rule:
+            windows_by_rule[key] = series_rows(data, policy, rule, events, arrays)
+        rows, valid, kept = windows_by_rule[key]
+
+        key = (rule.crisis_column, rule.skipped_nan_column)
+        if key not in crisis_by_rule:
+            crisis_by_rule[key] = _crisis_rows(data, policy, rule, events, arrays)
+        crisis_positions, crisis_offsets, selected = crisis_by_rule[key]
+
+        if rule.skipped_nan_column not in recovery_by_rule:
+            recovery_by_rule[rule.skipped_nan_column] = _recovery_rows(data, policy, rule, events, arrays)
+        recovery_positions, recovery_offsets = recovery_by_rule[rule.skipped_nan_column]
+
+        crisis = RaggedSeries(values[crisis_positions], crisis_offsets, events[selected].reset_index(drop=True))
+        recovery = RaggedSeries(values[recovery_positions], recovery_offsets)
+        extracted[column] = {
+            'series': windows_to_series(gather_windows(values, rows), valid, kept, events, ragged),
+            'crisis': crisis if ragged else crisis.to_lists(),
+            'recovery': recovery if ragged else recovery.to_lists(),
+        }
+
+    return extracted
+
+def series_rows(data, policy, rule, events, arrays):
+    '''
+    Locate the rows of the series around ts of a column.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    policy (Policy): The extraction method.
+    rule (VariableRule): The rule of the column.
+    events (DataFrame): The crisis event index of the dataset, or simulated events with the columns used by windows.window_rows.
+    arrays (dict): The columns of the dataset from events.panel_arrays.
+
+    Returns:
+    np.array: The row positions of the windows, from windows.window_rows.
+    np.array: The mask of the rows that belong to the series.
+    np.array: False for the windows to leave out.
+    '''
+    rows, valid, kept = window_rows(data, events, policy.horizon, nan_column=rule.nan_column, check_years=rule.check_years,
+                                    drop_on_excluded=policy.excluded == 'drop', arrays=arrays)
+
+    # Don't start a serie if the crisis occurs at the first row of the country as no information for ts-1 would be available
+    if rule.previous_year:
+        kept &= valid[:, 0]
+
+    return rows, valid, kept
+
+def _crisis_rows(data, policy, rule, events, arrays):
+    '''
+    Locate the rows of the crisis dynamics of a column.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    policy (Policy): The extraction method.
+    rule (VariableRule): The rule of the column.
+    events (DataFrame): The crisis event index of the dataset.
+    arrays (dict): The columns of the dataset from events.panel_arrays.
+
+    Returns:
+    np.array: The row positions of the values of all the series, one serie after the other.
+    np.array: The offsets of the series in the row positions, as in a RaggedSeries.
+    np.array: The mask of the events having a serie.
+
+    All the series are located with masks over the panel, without iterating through the events.
+    '''
+    crisis = arrays[rule.crisis_column]
+    n = len(data)
+
+    # Years kept in the iteration, their positions and the number of kept years before each row
+    kept = _kept_years(data, arrays, rule)
+    kept_rows = np.flatnonzero(kept)
+    kept_before = np.concatenate(([0], np.cumsum(kept)))
+    previous_kept = np.maximum.accumulate(np.where(kept, np.arange(n), -1)) if n else np.zeros(0, dtype=int)
+
+    start = events['start'].to_numpy()
+    country_start = events['country_start'].to_numpy()
+    country_end = events['country_end'].to_numpy()
+
+    # The first year has to begin a crisis period and have a year before it in the country
+    previous = np.where(start > 0, previous_kept[np.maximum(start - 1, 0)], -1)
+    selected = (start != country_start) & ~((previous >= country_start) & crisis[previous])
+    if policy.excluded == 'drop':
+        selected &= kept[start]
+
+    # The crisis period ends at the first kept year that is not a crisis year, and is contaminated from its first kept excluded year
+    stop = np.minimum(next_true(kept & ~crisis, start + 1), country_end)
+    contaminated = np.minimum(next_true(kept & crisis & ~arrays['banking_crisis_only'], start + 1), stop)
+    if policy.excluded == 'drop':
+        selected &= contaminated == stop
+    end = contaminated
+
+    start, end = start[selected], end[selected]
+
+    # Each serie holds ts-1, ts and the kept years of the crisis period after ts
+    lengths = 2 + kept_before[end] - kept_before[start + 1]
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    shifts = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+    rows = np.repeat(start, lengths) + shifts - 1
+    after = shifts >= 2
+    rows[after] = kept_rows[np.repeat(kept_before[start + 1], lengths)[after] + shifts[after] - 2]
+
+    return rows, offsets, selected
+
+def _recovery_rows(data, policy, rule, events, arrays):
+    '''
+    Locate the rows of the recovery dynamics of a column.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    policy (Policy): The extraction method.
+    rule (VariableRule): The rule of the column.
+    events (DataFrame): The crisis event index of the dataset.
+    arrays (dict): The columns of the dataset from events.panel_arrays.
+
+    Returns:
+    np.array: The row positions of the values of all the series, one serie after the other.
+    np.array: The offsets of the series in the row positions, as in a RaggedSeries.
+
+    The years of each country are scanned from its first crisis event with a kept first year, skipping the years with a NaN
+    value in the skipped_nan_column.
+    They are split in segments, each starting at a year that ends the recovery period (neither a recovery year nor an excluded year),
+    and each segment gives at most one serie: its recovery years before its first excluded year. With contaminated_recovery,
+    the excluded years of a banking crisis do not end the segment, but they leave out the recoveries that follow them until a
+    recovery has been appended or a new crisis starts.
+    '''
+    n = len(data)
+    kept = _kept_years(data, arrays, rule)
+
+    # Years from the first crisis event of each country whose first year is kept to the end of the country, as the first
+    # years with a NaN value do not start a crisis
+    kept_events = events[kept[events['start'].to_numpy()]]
+    country_start = kept_events['country_start'].to_numpy()
+    first_event = np.ones(len(kept_events), dtype=bool)
+    first_event[1:] = country_start[1:] != country_start[:-1]
+    first_start = kept_events['start'].to_numpy()[first_event]
+    bounds = np.zeros(n + 1, dtype=int)
+    np.add.at(bounds, first_start, 1)
+    np.add.at(bounds, kept_events['country_end'].to_numpy()[first_event], -1)
+    rows = np.flatnonzero((np.cumsum(bounds[:-1]) > 0) & kept)
+
+    # Category of each scanned year
+    recovery = arrays['recovery_only'][rows]
+    excluded = arrays['excluded_years'][rows] & ~recovery
+    excluded_recovery = excluded & ~arrays['banking_crisis'][rows]
+    excluded_crisis = excluded & arrays['banking_crisis'][rows] & policy.contaminated_recovery
+    ends = ~recovery & ~excluded_recovery & ~excluded_crisis
+
+    # A segment starts at each year ending the recovery period and at the first scanned year of each country
+    country = np.searchsorted(first_start, rows, side='right') - 1
+    new_country = np.ones(len(rows), dtype=bool)
+    new_country[1:] = country[1:] != country[:-1]
+    segment_start = ends | new_country
+    segment = np.cumsum(segment_start) - 1
+    segment_first = np.flatnonzero(segment_start)
+    segments = len(segment_first)
+
+    # Recovery years appended before the first excluded year of their segment (group-wise cummax of the excluded years)
+    blocking = np.concatenate(([0], np.cumsum(excluded_recovery | excluded_crisis)))
+    blocked = blocking[np.arange(len(rows)) + 1] - blocking[segment_first[segment]] > 0
+    appended = recovery & ~blocked
+
+    # A segment is contaminated if an earlier segment ended with an excluded year of a crisis and no appended recovery,
+    # and no first year of crisis or new country started a segment in between
+    closed_contaminated = (np.bincount(segment[excluded_crisis], minlength=segments) > 0) & \
+                          (np.bincount(segment[appended], minlength=segments) == 0)
+    reset = new_country[segment_first] | arrays['banking_crisis_only_first_year'][rows[segment_first]]
+    positions = np.arange(segments)
+    last_reset = np.maximum.accumulate(np.where(reset, positions, -1)) if segments else positions
+    last_contaminated = np.maximum.accumulate(np.where(closed_contaminated, positions, -1)) if segments else positions
+    contaminated = np.concatenate(([-1], last_contaminated[:-1]))[:segments] >= last_reset
+
+    appended &= ~contaminated[segment]
+
+    lengths = np.bincount(segment[appended], minlength=segments)
+    offsets = np.concatenate(([0], np.cumsum(lengths[lengths > 0])))
+    return rows[appended], offsets
+
+def _kept_years(data, arrays, rule):
+    '''
+    Find the years kept by the crisis and recovery dynamics.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    arrays (dict): The columns of the dataset from events.panel_arrays.
+    rule (VariableRule): The rule of the extracted column.
+
+    Returns:
+    np.array: False for the years with a NaN value in the skipped_nan_column of the rule.
+    '''
+    if rule.skipped_nan_column is None:
+        return np.ones(len(data), dtype=bool)
+    return ~np.isnan(column_array(data, arrays, rule.skipped_nan_column))
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from statistics import NormalDist
+
+def crisis_phase_effects(data, columns=('annual_inflation', 'output_gap'),
+                         regressors=('banking_crisis_only', 'recovery_only', 'excluded_years'), absorb=('CC3', 'Year'),
+                         cluster='CC3', level=0.95, tolerance=1e-10, max_iterations=10000):
+    '''
+    Estimate the effects of the crisis and recovery years on columns, with country and year fixed effects.
+
+    Args:
+    data (DataFrame): The dataset created by concat_dataset and dummy_variable.
+    columns (tuple, optional): The dependent variables. Default is ('annual_inflation', 'output_gap').
+    regressors (tuple, optional): The dummies of the crisis phases. Default is ('banking_crisis_only', 'recovery_only', 'excluded_years').
+    absorb (tuple, optional): The columns of the absorbed fixed effects. Default is ('CC3', 'Year').
+    cluster (str, optional): The column defining the clusters of the standard errors. Default is 'CC3'.
+    level (float, optional): The level of the confidence intervals. Default is 0.95.
+    tolerance (float, optional): The convergence tolerance of the alternating projections. Default is 1e-10.
+    max_iterations (int, optional): The maximum number of alternating projections. Default is 10000.
+
+    Returns:
+    DataFrame: A DataFrame with one row per dependent variable and regressor, and the following columns:
+        - 'variable', 'regressor': The dependent variable and the regressor.
+        - 'coefficient': The effect of the regressor, NaN if it is collinear with the previous regressors and the fixed effects.
+        - 'std_error': Its standard error, clustered by the cluster column, NaN with less than two clusters.
+        - 'lower', 'upper': The bounds of its confidence interval.
+        - 'observations', 'clusters': The number of observations and clusters of the regression.
+        - 'iterations': The number of alternating projections until convergence.
+
+    The fixed effects are absorbed with the method of alternating projections: the variables are demeaned by country, then by
+    year, and so on until they do not change, which handles the unbalanced panel without any dummy column. The group means
+    are products with sparse indicator matrices. When the regressors sum to one on the sample (as the three crisis phases do
+    when inflation is known), the last collinear regressor is omitted and the others are effects relative to it. The standard
+    errors use the small-sample correction G/(G-1) * (N-1)/(N-k), where k counts the fixed effects not nested in the clusters.
+    '''
+    regressors = list(regressors)
+    X = data[regressors].to_numpy(dtype=float, na_value=np.nan)
+    groups = [pd.factorize(np.asarray(data[column]))[0] for column in absorb]
+    clusters = pd.factorize(np.asarray(data[cluster]))[0]
+    critical_value = NormalDist().inv_cdf(0.5 + level / 2)
+
+    results = []
+    for column in columns:
+        y = data[column].to_numpy(dtype=float, na_value=np.nan)
+        sample = ~np.isnan(y) & ~np.isnan(X).any(axis=1) & np.all([codes >= 0 for codes in groups], axis=0)
+
+        # Absorb the fixed effects of the dependent variable and the regressors at once
+        sample_groups = [pd.factorize(codes[sample])[0] for codes in groups]
+        demeaned, iterations = _demean(np.column_stack([y[sample], X[sample]]), sample_groups, tolerance, max_iterations)
+
+        # Fixed effects counted in the degrees of freedom: the ones nested in the clusters are not
+        absorbed = sum(codes.max() + 1 for name, codes in zip(absorb, sample_groups) if name != cluster and len(codes))
+        absorbed = max(absorbed - (len(absorb) - 1), 0)
+
+        coefficients, std_errors = _within_ols(demeaned[:, 0], demeaned[:, 1:], pd.factorize(clusters[sample])[0], absorbed)
+        observations = int(sample.sum())
+
+        results.append(pd.DataFrame({
+            'variable': column,
+            'regressor': regressors,
+            'coefficient': coefficients,
+            'std_error': std_errors,
+            'lower': coefficients - critical_value * std_errors,
+            'upper': coefficients + critical_value * std_errors,
+            'observations': observations,
+            'clusters': len(np.unique(clusters[sample])),
+            'iterations': iterations,
+        }))
+
+    return pd.concat(results, ignore_index=True)
+
+def _demean(values, groups, tolerance, max_iterations):
+    '''
+    Remove the fixed effects of several groupings from the columns of values with alternating projections.
+
+    Args:
+    values (np.array): An (n, m) array with the variables to demean.
+    groups (list): The group code of each row, for each grouping.
+    tolerance (float): The largest change of the values at convergence, relative to their scale.
+    max_iterations (int): The maximum number of passes over the groupings.
+
+    Returns:
+    np.array: The (n, m) residuals of the projection of values on the fixed effects.
+    int: The number of passes over the groupings.
+    '''
+    n = len(values)
+    values = values.copy()
+    if n == 0:
+        return values, 0
+
+    # One sparse indicator matrix and one group size vector per grouping
+    indicators = [sparse.csr_matrix((np.ones(n), (np.arange(n), codes)), shape=(n, codes.max() + 1)) for codes in groups]
+    sizes = [np.asarray(indicator.sum(axis=0)).ravel()[:, None] for indicator in indicators]
+    scale = np.maximum(np.abs(values).max(axis=0), 1)
+
+    for iteration in range(1, max_iterations + 1):
+        change = 0
+        for indicator, size in zip(indicators, sizes):
+            means = (indicator.T @ values) / size
+            values -= indicator @ means
+            change = max(change, (np.abs(means).max(axis=0) / scale).max())
+        # With a single grouping, one pass is exact
+        if change < tolerance or len(groups) == 1:
+            break
+
+    return values, iteration
+
+def _within_ols(y, X, clusters, absorbed):
+    '''
+    Solve the regression of demeaned y on demeaned X, with cluster-robust standard errors.
+
+    Args:
+    y (np.array): The demeaned dependent variable.
+    X (np.array): The (n, k) demeaned regressors.
+    clusters (np.array): The cluster code of each row.
+    absorbed (int): The number of absorbed fixed effects counted in the degrees of freedom.
+
+    Returns:
+    np.array: The coefficient of each regressor, NaN for the omitted collinear regressors.
+    np.array: Their cluster-robust standard errors, NaN with less than two clusters.
+    '''
+    n, k = X.shape
+    coefficients = np.full(k, np.nan)
+    std_errors = np.full(k, np.nan)
+
+    # Keep the regressors which are not collinear with the previous ones
+    kept = []
+    for j in range(k):
+        if np.linalg.matrix_rank(X[:, kept + [j]], tol=1e-8 * max(np.sqrt(n), 1)) == len(kept) + 1:
+            kept.append(j)
+    if not kept:
+        return coefficients, std_errors
+
+    Z = X[:, kept]
+    bread = np.linalg.inv(Z.T @ Z)
+    beta = bread @ (Z.T @ y)
+    residuals = y - Z @ beta
+
+    # Sum the scores of each cluster
+    scores = np.column_stack([np.bincount(clusters, weights=Z[:, j] * residuals) for j in range(len(kept))])
+    G = len(scores)
+    correction = G / max(G - 1, 1) * (n - 1) / max(n - len(kept) - absorbed, 1)
+    covariance = correction * bread @ (scores.T @ scores) @ bread
+
+    coefficients[kept] = beta
+    # The clustered standard errors are not defined with a single cluster
+    if G > 1:
+        std_errors[kept] = np.sqrt(np.diagonal(covariance))
+    return coefficients, std_errors
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from scipy.linalg import cholesky_banded, cho_solve_banded
+
+@lru_cache(maxsize=None)
+def _second_difference_bands(n):
+    '''
+    Build the banded form of K'K, where K is the (n-2) x n second-difference operator.
+
+    Args:
+    n (int): The length of the series.
+
+    Returns:
+    np.array: A (3, n) array holding the upper bands of K'K in the layout used by scipy.linalg.cholesky_banded.
+    '''
+    bands = np.zeros((3, n))
+    coefficients = (1., -2., 1.)
+
+    # Each row r of K has the coefficients (1, -2, 1) in the columns r, r+1 and r+2
+    for a in range(3):
+        for b in range(a, 3):
+            bands[2 + a - b, b:n - 2 + b] += coefficients[a] * coefficients[b]
+
+    bands.setflags(write=False)
+    return bands
+
+@lru_cache(maxsize=1024)
+def _hp_factor(n, lamb):
+    '''
+    Compute the banded Cholesky factor of (I + lamb * K'K) for series of length n.
+
+    Args:
+    n (int): The length of the series.
+    lamb (float): The smoothing parameter of the Hodrick-Prescott filter.
+
+    Returns:
+    np.array: The upper banded Cholesky factor, cached by (n, lamb).
+    '''
+    matrix = lamb * _second_difference_bands(n)
+    matrix[2] += 1
+    factor = cholesky_banded(matrix)
+
+    factor.setflags(write=False)
+    return factor
+
+def hp_trend(y, lamb=1600):
+    '''
+    Compute the Hodrick-Prescott trend of one or several series of the same length.
+
+    Args:
+    y (array-like): A series of length n, or an (n, k) array holding k series in its columns.
+    lamb (float, optional): The smoothing parameter of the Hodrick-Prescott filter. Default is 1600.
+
+    Returns:
+    np.array: The trend, with the same shape as y.
+
+    The trend solves (I + lamb * K'K) trend = y. The banded factorization of this system only depends on the length
+    of the series and on lamb, so it is cached and all the columns of y are solved at once. The columns are solved
+    independently, so a series with a NaN value gets a trend of NaN, as with statsmodels' hpfilter, without affecting
+    the other columns.
+    '''
+    y = np.asarray(y, dtype=float)
+    if len(y) == 0:
+        return y.copy()
+    # The finiteness check would reject the whole matrix for one NaN value
+    return cho_solve_banded((_hp_factor(len(y), float(lamb)), False), y, check_finite=False)
+
+def hp_trend_groups(values, groups, lamb=1600):
+    '''
+    Compute the Hodrick-Prescott trend of every group of a panel.
+
+    Args:
+    values (array-like): The values of the panel.
+    groups (array-like): The group (e.g. country code) of each value, with no missing group. The values of a group are filtered in the order they appear.
+    lamb (float, optional): The smoothing parameter of the Hodrick-Prescott filter. Default is 1600.
+
+    Returns:
+    np.array: The trend of each value, aligned with values.
+
+    The groups sharing the same length are stacked in a matrix and detrended with a single multi-right-hand-side solve.
+    '''
+    return hp_trend_sweep(values, groups, [lamb])[:, 0]
+
+def hp_trend_sweep(values, groups, lambs):
+    '''
+    Compute the Hodrick-Prescott trend of every group of a panel for several smoothing parameters.
+
+    Args:
+    values (array-like): The values of the panel.
+    groups (array-like): The group (e.g. country code) of each value, with no missing group. The values of a group are filtered in the order they appear.
+    lambs (list): The smoothing parameters of the Hodrick-Prescott filter.
+
+    Returns:
+    np.array: An (n, len(lambs)) array with the trend of each value for each smoothing parameter.
+
+    The grouping of the panel and the stacked matrix of each series length are built once and shared by every smoothing parameter.
+    '''
+    values = np.asarray(values, dtype=float)
+    trend = np.empty((len(values), len(lambs)))
+
+    for columns in _columns_by_length(groups):
+        # Values of every group of this length, one group per column
+        stacked = values[columns]
+        for j, lamb in enumerate(lambs):
+            trend[columns, j] = hp_trend(stacked, lamb)
+
+    return trend
+
+def _columns_by_length(groups):
+    '''
+    Group the positions of a panel by group, stacking the groups of the same length.
+
+    Args:
+    groups (array-like): The group of each value.
+
+    Returns:
+    list: A list of (length, k) arrays of positions, one for each distinct group length, holding one group per column.
+    '''
+    # Sort the rows by group while keeping the order of the rows inside each group
+    codes, _ = pd.factorize(np.asarray(groups))
+    order = np.argsort(codes, kind='stable')
+    lengths = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    return [order[starts[lengths == length][None, :] + np.arange(length)[:, None]]
+            for length in np.unique(lengths) if length > 0]
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from events import column_array, panel_arrays
+
+def local_projections(data, columns=('annual_inflation', 'output_gap'), shock='banking_crisis_only_first_year', horizons=8, lags=2,
+                      cluster='CC3', level=0.95):
+    '''
+    Estimate the impulse responses of columns to banking crises with local projections (Jorda, 2005).
+
+    Args:
+    data (DataFrame): The dataset created by concat_dataset and dummy_variable, with the rows of each country following each other.
+    columns (tuple, optional): The response variables. Default is ('annual_inflation', 'output_gap').
+    shock (str, optional): The dummy of the shock. Default is 'banking_crisis_only_first_year'.
+    horizons (int, optional): The last horizon H of the responses, estimated for h = 0..H. Default is 8.
+    lags (int, optional): The number of lags of the response variable used as controls. Default is 2.
+    cluster (str, optional): The column defining the clusters of the standard errors. Default is 'CC3'.
+    level (float, optional): The level of the confidence intervals. Default is 0.95.
+
+    Returns:
+    DataFrame: A DataFrame with one row per response variable and horizon, and the following columns:
+        - 'variable', 'horizon': The response variable and the horizon h.
+        - 'coefficient': The response of y(t+h) to the shock in t, NaN if the shock does not vary on the sample of the horizon.
+        - 'std_error': Its standard error, clustered by the cluster column, NaN with less than two clusters.
+        - 'lower', 'upper': The bounds of its confidence interval.
+        - 'observations', 'clusters': The number of observations and clusters of the regression.
+
+    For each horizon h, y(t+h) is regressed on the shock in t and on y(t-1), ..., y(t-lags), with country fixed effects.
+    The leads and lags are taken within each country and only when the years follow each other, so the sample of each
+    horizon is unbalanced. The fixed effects are removed by demeaning each country on the sample of each horizon, and all the
+    horizons are stacked in arrays and solved with one batched least-squares pass. The standard errors use the small-sample
+    correction G/(G-1) * (N-1)/(N-k) of the within estimator, where k does not count the absorbed fixed effects.
+    '''
+    arrays = panel_arrays(data)
+    countries, _ = pd.factorize(np.asarray(data['CC3']))
+    clusters, _ = pd.factorize(np.asarray(data[cluster]))
+    years = arrays['Year']
+    impulse = column_array(data, arrays, shock) == 1
+    critical_value = NormalDist().inv_cdf(0.5 + level / 2)
+
+    results = []
+    for column in columns:
+        y = column_array(data, arrays, column)
+
+        # Responses y(t+h) of each horizon and regressors (shock, lags of y) of each row
+        responses = np.stack([_shift(y, countries, years, h) for h in range(horizons + 1)])
+        regressors = np.column_stack([impulse.astype(float)] + [_shift(y, countries, years, -lag) for lag in range(1, lags + 1)])
+        sample = ~np.isnan(responses) & ~np.isnan(regressors).any(axis=1)
+
+        coefficients, std_errors, observations, n_clusters = _batched_within_ols(responses, regressors, sample, countries, clusters)
+
+        results.append(pd.DataFrame({
+            'variable': column,
+            'horizon': np.arange(horizons + 1),
+            'coefficient': coefficients[:, 0],
+            'std_error': std_errors[:, 0],
+            'lower': coefficients[:, 0] - critical_value * std_errors[:, 0],
+            'upper': coefficients[:, 0] + critical_value * std_errors[:, 0],
+            'observations': observations,
+            'clusters': n_clusters,
+        }))
+
+    return pd.concat(results, ignore_index=True)
+
+def _shift(values, countries, years, h):
+    '''
+    Get the value of each row h years later (or -h years earlier) in the same country.
+
+    Args:
+    values (np.array): The values of the panel.
+    countries (np.array): The country code of each row.
+    years (np.array): The year of each row.
+    h (int): The number of years, negative for lags.
+
+    Returns:
+    np.array: The value h years after each row, NaN if this year is not the row h rows after in the same country.
+    '''
+    n = len(values)
+    rows = np.arange(n) + h
+    inside = (rows >= 0) & (rows < n)
+    rows = np.clip(rows, 0, max(n - 1, 0))
+    found = inside & (countries[rows] == countries) & (years[rows] == years + h)
+    return np.where(found, values[rows], np.nan)
+
+def _batched_within_ols(responses, regressors, sample, groups, clusters):
+    '''
+    Solve the fixed-effects regressions of several responses on the same regressors, each on its own sample.
+
+    Args:
+    responses (np.array): An (H, n) array with the response of each regression.
+    regressors (np.array): An (n, k) array with the regressors.
+    sample (np.array): An (H, n) boolean mask of the rows of each regression.
+    groups (np.array): The fixed-effect group code of each row.
+    clusters (np.array): The cluster code of each row.
+
+    Returns:
+    np.array: An (H, k) array with the coefficients of each regression, NaN for the regressions with collinear regressors.
+    np.array: An (H, k) array with their cluster-robust standard errors, NaN for the regressions with less than two clusters.
+    np.array: The number of observations of each regression.
+    np.array: The number of clusters of each regression.
+    '''
+    H, n = responses.shape
+    k = regressors.shape[1]
+    weights = sample.astype(float)
+    y = np.where(sample, responses, 0)
+    X = np.where(sample[:, :, None], regressors[None, :, :], 0)
+
+    # Within transformation: demean each group on the sample of each regression, with bincounts over (regression, group)
+    n_groups = groups.max() + 1 if n else 0
+    index = (np.arange(H)[:, None] * n_groups + groups[None, :]).ravel()
+    sizes = np.bincount(index, weights=weights.ravel(), minlength=H * n_groups)
+    sizes = np.maximum(sizes, 1)
+    y = y - (np.bincount(index, weights=y.ravel(), minlength=H * n_groups) / sizes)[index].reshape(H, n) * weights
+    X = X - np.stack([(np.bincount(index, weights=X[:, :, j].ravel(), minlength=H * n_groups) / sizes)[index].reshape(H, n)
+                      for j in range(k)], axis=2) * weights[:, :, None]
+
+    # Normal equations of all the regressions at once. The regressions with collinear regressors (e.g. a horizon without
+    # any shock in its sample) are solved with an identity matrix and reported as NaN
+    singular = np.linalg.matrix_rank(X, tol=1e-8 * max(np.sqrt(n), 1)) < k if n else np.ones(H, dtype=bool)
+    XtX = np.einsum('hnk,hnl->hkl', X, X)
+    XtX[singular] = np.eye(k)
+    Xty = np.einsum('hnk,hn->hk', X, y)
+    coefficients = np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+
+    # Cluster-robust covariance, summing the scores of each cluster
+    residuals = (y - np.einsum('hnk,hk->hn', X, coefficients)) * weights
+    n_clusters_total = clusters.max() + 1 if n else 0
+    cluster_index = (np.arange(H)[:, None] * n_clusters_total + clusters[None, :]).ravel()
+    scores = np.stack([np.bincount(cluster_index, weights=(X[:, :, j] * residuals).ravel(), minlength=H * n_clusters_total)
+                       for j in range(k)], axis=1).reshape(H, n_clusters_total, k)
+    meat = np.einsum('hgk,hgl->hkl', scores, scores)
+    bread = np.linalg.inv(XtX)
+
+    observations = sample.sum(axis=1)
+    n_clusters = np.array([len(np.unique(clusters[row])) for row in sample])
+    correction = n_clusters / np.maximum(n_clusters - 1, 1) * (observations - 1) / np.maximum(observations - k, 1)
+    covariance = correction[:, None, None] * bread @ meat @ bread
+    std_errors = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+
+    # The clustered standard errors are not defined with a single cluster
+    coefficients[singular] = np.nan
+    std_errors[singular | (n_clusters < 2)] = np.nan
+
+    return coefficients, std_errors, observations, n_clusters
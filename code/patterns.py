@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from series import RaggedSeries
+
+def padded_series(series):
+    '''
+    Convert series to a padded matrix.
+
+    Args:
+    series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
+
+    Returns:
+    np.array: An (n_series, max_length) matrix with one series per row, padded with NaN.
+    np.array: An (n_series, max_length) boolean mask of the values of the series.
+    '''
+    if not isinstance(series, RaggedSeries):
+        series = RaggedSeries.from_lists(series)
+    return series.to_padded()
+
+def average_pattern(matrix, mask):
+    '''
+    Compute the average pattern of padded series.
+
+    Args:
+    matrix (np.array): An (n_series, max_length) matrix with one series per row, from padded_series.
+    mask (np.array): The (n_series, max_length) boolean mask of the values of the series.
+
+    Returns:
+    np.array: The average of the series at each position, 0 where there is no value.
+    np.array: The number of data points at each position.
+
+    The values of each position are summed in the order of the series, so the averages are the same as when
+    summing the series one by one.
+    '''
+    counts = mask.sum(axis=0)
+    sums = np.where(mask, matrix, 0).sum(axis=0)
+    return np.where(counts > 0, sums / np.maximum(counts, 1), 0), counts
+
+def pattern_statistics(series, quantiles=(0.05, 0.25, 0.75, 0.95)):
+    '''
+    Compute the statistics of the series at each position (ts-1, ts, ts+1, ...).
+
+    Args:
+    series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
+    quantiles (tuple, optional): The quantiles to compute, between 0 and 1. Default is (0.05, 0.25, 0.75, 0.95).
+
+    Returns:
+    DataFrame: A DataFrame with one row per position and the following columns:
+        - 'mean': The average of the series, as in compute_pattern.
+        - 'count': The number of data points.
+        - 'std': The sample standard deviation (NaN with less than two data points).
+        - 'sem': The standard error of the mean, std / sqrt(count).
+        - 'median': The median.
+        - 'q<quantile>' (e.g. 'q0.05'): Each quantile, linearly interpolated as with np.quantile.
+
+    All the statistics are computed at once on the padded matrix of the series. The median and the quantiles ignore NaN values.
+    '''
+    matrix, mask = padded_series(series)
+    mean, counts = average_pattern(matrix, mask)
+
+    # Sample standard deviation around the mean of each position
+    deviations = np.where(mask, matrix - mean, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        std = np.where(counts > 1, np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1)), np.nan)
+        sem = std / np.sqrt(counts)
+
+    statistics = pd.DataFrame({'mean': mean, 'count': counts, 'std': std, 'sem': sem})
+
+    # Quantiles from the sorted values of each position, the NaN values and the padding being sorted last
+    ordered = np.sort(matrix, axis=0)
+    valid = (~np.isnan(ordered)).sum(axis=0)
+    for name, q in [('median', 0.5)] + [(f'q{q:g}', q) for q in quantiles]:
+        statistics[name] = _sorted_quantile(ordered, valid, q)
+
+    return statistics
+
+def _sorted_quantile(ordered, valid, q):
+    '''
+    Compute a quantile of each column of a matrix sorted along its columns.
+
+    Args:
+    ordered (np.array): A matrix whose columns are sorted, with their valid values first.
+    valid (np.array): The number of valid values of each column.
+    q (float): The quantile, between 0 and 1.
+
+    Returns:
+    np.array: The quantile of the valid values of each column, linearly interpolated, or NaN if a column has no valid value.
+    '''
+    columns = np.arange(ordered.shape[1])
+    position = q * np.maximum(valid - 1, 0)
+    below = np.floor(position).astype(int)
+    above = np.minimum(below + 1, np.maximum(valid - 1, 0))
+    if ordered.shape[0] == 0:
+        return np.full(ordered.shape[1], np.nan)
+
+    low = ordered[below, columns]
+    high = ordered[above, columns]
+    quantile = low + (high - low) * (position - below)
+    return np.where(valid > 0, quantile, np.nan)
@@ -0,0 +1,333 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import pandas as pd
+import cache
+import dataset
+import events
+import extraction
+import extraction_method_1
+import patterns
+import preprocess
+import series
+import sweep
+import windows
+
+# The outputs of the stages are invalidated whenever the code of the pipeline changes
+SOURCE_FILES = cache.SOURCE_FILES + [events.__file__, extraction.__file__, patterns.__file__, series.__file__, sweep.__file__,
+                                     windows.__file__, __file__]
+
+# Parameters of a run of the default stages
+DEFAULT_PARAMETERS = {'crises_path': '../raw_data/global_crisis_data_country.csv',
+                      'maddison_path': '../raw_data/gdp-per-capita-maddison.csv',
+                      'countries': sweep.GROUPS['G20'],
+                      'how': 'left',
+                      'smoothing_param': 6.25,
+                      'method': 1,
+                      'variable': 'annual_inflation',
+                      'horizon': 8,
+                      'normalize': True,
+                      'duration': None}
+
+@dataclass(frozen=True)
+class Stage:
+    '''
+    A stage of the pipeline.
+
+    Attributes:
+    name (str): The name of the stage, used by the stages depending on it.
+    function (function): The function computing the output of the stage. It is called with the outputs of the inputs as
+        positional arguments, then the parameters and files as keyword arguments, and must not modify its inputs.
+    inputs (tuple): The names of the stages whose outputs are the inputs of the stage.
+    params (tuple): The names of the parameters of the run used by the stage.
+    files (tuple): The names of the parameters of the run holding paths of files read by the stage, hashed by their content.
+    memoize (bool): False for the stages run for their side effects (e.g. saving a plot), which are computed at each run and
+        never cached.
+    '''
+    name: str
+    function: object
+    inputs: tuple = ()
+    params: tuple = ()
+    files: tuple = ()
+    memoize: bool = True
+
+class Pipeline:
+    '''
+    A chain of stages whose outputs are memoized by a hash of everything they depend on.
+
+    The key of a stage is the hash of its name, the code of the pipeline and of its function, its parameters, the content of its
+    files and the keys of its inputs, so it is known without running anything. A stage is only computed when its key is found neither in memory
+    (with least recently used eviction) nor in the optional disk cache, and its inputs are only resolved in that case.
+    Changing a parameter therefore only recomputes the stages using it and the stages after them.
+    '''
+    def __init__(self, stages=None, cache_dir=None, max_entries=32, max_bytes=cache.DEFAULT_MAX_BYTES):
+        '''
+        Args:
+        stages (list, optional): The stages of the pipeline. Default is STAGES.
+        cache_dir (str, optional): The directory of the disk cache, or None to only keep the outputs in memory. Default is None.
+        max_entries (int, optional): The maximum number of outputs kept in memory. Default is 32.
+        max_bytes (int, optional): The maximum size of the disk cache. Default is 512 MB.
+        '''
+        self.stages = {stage.name: stage for stage in (STAGES if stages is None else stages)}
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+
+    def add(self, stage):
+        '''
+        Add a stage to the pipeline, or replace the stage of the same name.
+
+        Args:
+        stage (Stage): The stage to add, e.g. a plot of the 'pattern' stage (with memoize=False to draw it at each run).
+        '''
+        self.stages[stage.name] = stage
+
+    def run(self, targets, **parameters):
+        '''
+        Compute the outputs of some stages, reusing the memoized outputs of the previous runs.
+
+        Args:
+        targets (list): The names of the stages whose outputs are returned.
+        **parameters: The parameters of the run, completing DEFAULT_PARAMETERS.
+
+        Returns:
+        dict: The output of each target stage. The outputs are shared with the cache and must not be modified.
+        DataFrame: The report of the run, with one row per resolved stage and the following columns:
+            - 'stage', 'key': The stage and the beginning of its key.
+            - 'status': 'memory' or 'disk' when the output was cached, 'computed' otherwise.
+            - 'seconds': The time spent on the stage, without its inputs.
+        '''
+        parameters = dict(DEFAULT_PARAMETERS, **parameters)
+        sources = [cache.file_digest(path) for path in SOURCE_FILES]
+        keys, outputs, report = {}, {}, []
+
+        for target in targets:
+            self._resolve(target, parameters, sources, keys, outputs, report)
+
+        return {target: outputs[target] for target in targets}, pd.DataFrame(report, columns=['stage', 'key', 'status', 'seconds'])
+
+    def key(self, name, parameters, sources, keys):
+        '''
+        Compute the key of a stage.
+
+        Args:
+        name (str): The name of the stage.
+        parameters (dict): The parameters of the run.
+        sources (list): The digests of the source files.
+        keys (dict): The keys already computed in the run, completed by this function.
+
+        Returns:
+        str: The hexadecimal key of the stage.
+        '''
+        if name not in keys:
+            stage = self.stages[name]
+            parts = [name, sources, _function_digest(stage.function),
+                     [(param, parameters[param]) for param in stage.params],
+                     [cache.file_digest(parameters[file]) for file in stage.files],
+                     [self.key(input, parameters, sources, keys) for input in stage.inputs]]
+            keys[name] = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+        return keys[name]
+
+    def _resolve(self, name, parameters, sources, keys, outputs, report):
+        '''
+        Get the output of a stage from the memory, the disk cache or its function, resolving its inputs only if needed.
+
+        Args:
+        name (str): The name of the stage.
+        parameters (dict): The parameters of the run.
+        sources (list): The digests of the source files.
+        keys (dict): The keys computed in the run.
+        outputs (dict): The outputs resolved in the run, completed by this function.
+        report (list): The rows of the report, completed by this function.
+
+        Returns:
+        object: The output of the stage.
+        '''
+        if name in outputs:
+            return outputs[name]
+
+        stage = self.stages[name]
+        key = self.key(name, parameters, sources, keys)
+        directory = os.path.join(self.cache_dir, f'{name}-{key}') if self.cache_dir is not None else None
+
+        if not stage.memoize:
+            inputs = [self._resolve(input, parameters, sources, keys, outputs, report) for input in stage.inputs]
+            start = time.perf_counter()
+            output = stage.function(*inputs, **{param: parameters[param] for param in stage.params + stage.files})
+            outputs[name] = output
+            report.append({'stage': name, 'key': key[:12], 'status': 'computed', 'seconds': time.perf_counter() - start})
+            return output
+
+        if key in self.memory:
+            start = time.perf_counter()
+            self.memory.move_to_end(key)
+            output, status = self.memory[key], 'memory'
+        elif directory is not None and os.path.exists(os.path.join(directory, 'meta.json')):
+            start = time.perf_counter()
+            # Record the access for the eviction policy of the disk cache
+            os.utime(os.path.join(directory, 'meta.json'))
+            output, status = cache.load_output(directory), 'disk'
+        else:
+            inputs = [self._resolve(input, parameters, sources, keys, outputs, report) for input in stage.inputs]
+            start = time.perf_counter()
+            output = stage.function(*inputs, **{param: parameters[param] for param in stage.params + stage.files})
+            status = 'computed'
+            if directory is not None:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                cache.save_output(output, directory)
+                cache.evict(self.cache_dir, self.max_bytes, keep=directory)
+
+        # Keep the output in memory, evicting the least recently used ones
+        self.memory[key] = output
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+        outputs[name] = output
+        report.append({'stage': name, 'key': key[:12], 'status': status, 'seconds': time.perf_counter() - start})
+        return output
+
+def _function_digest(function):
+    '''
+    Hash the identity and the code of the function of a stage.
+
+    Args:
+    function (function): The function.
+
+    Returns:
+    str: The hexadecimal SHA-256 digest of its module, its qualified name and its source (or its bytecode and constants when
+    the source is not available, e.g. for a function defined in an interactive session). The values of its closure and of
+    the globals it reads are not hashed.
+    '''
+    try:
+        code = inspect.getsource(function)
+    except (OSError, TypeError):
+        code = getattr(function, '__code__', None)
+        code = repr(function) if code is None else f'{code.co_code.hex()}{code.co_consts!r}'
+    identity = f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}"
+    return hashlib.sha256(f'{identity}\n{code}'.encode()).hexdigest()
+
+def load_crises(crises_path):
+    '''
+    Read and preprocess the Global Crises dataset, as in the notebooks.
+
+    Args:
+    crises_path (str): The path of the csv file of the Global Crises dataset.
+
+    Returns:
+    DataFrame: The preprocessed dataset.
+    '''
+    main_data = pd.read_csv(crises_path, encoding='unicode_escape')
+    preprocess.preprocess_global_crises_data(main_data)
+    return main_data
+
+def load_maddison(maddison_path):
+    '''
+    Read and preprocess the Maddison GDP per capita dataset, as in the notebooks.
+
+    Args:
+    maddison_path (str): The path of the csv file of the Maddison dataset.
+
+    Returns:
+    DataFrame: The preprocessed dataset.
+    '''
+    GDP_pc = pd.read_csv(maddison_path)
+    preprocess.preprocess_mdp_data(GDP_pc)
+    return GDP_pc
+
+def build_panel(main_data, GDP_pc, countries, how, smoothing_param):
+    '''
+    Build the panel of a list of countries with concat_dataset and dummy_variable.
+
+    Args:
+    main_data (DataFrame): The preprocessed Global Crises dataset.
+    GDP_pc (DataFrame): The preprocessed Maddison dataset.
+    countries (list): List of country codes to include in the panel.
+    how (str): Type of merge to be performed ('left' or 'inner').
+    smoothing_param (float): The smoothing parameter for the Hodrick-Prescott filter.
+
+    Returns:
+    DataFrame: The panel with its dummy variables.
+    '''
+    data = dataset.concat_dataset(main_data, GDP_pc, countries, how, smoothing_param)
+    dataset.dummy_variable(data)
+    return data
+
+def crisis_durations(data, events, method):
+    '''
+    Compute the crisis durations of a panel with compute_crisis_duration of an extraction method.
+
+    Args:
+    data (DataFrame): The panel.
+    events (DataFrame): The event index of the panel.
+    method (int): The extraction method, 1 or 2.
+
+    Returns:
+    list: The duration of each crisis event.
+    '''
+    return sweep.METHODS[method][1](data, events)
+
+def extracted_series(data, events, method, variable, horizon):
+    '''
+    Extract the series of a variable around the first years of crisis with an extraction method.
+
+    Args:
+    data (DataFrame): The panel.
+    events (DataFrame): The event index of the panel.
+    method (int): The extraction method, 1 or 2.
+    variable (str): The column to extract, e.g. 'annual_inflation' or 'output_gap'.
+    horizon (int): The number of years extracted after the first year of each crisis.
+
+    Returns:
+    RaggedSeries: The series of the variable.
+    '''
+    policy = replace(sweep.METHODS[method][0], horizon=horizon)
+    return extraction.extract_series(data, variable, policy, events, ragged=True)
+
+def normalized_series(series, normalize):
+    '''
+    Normalize series based on their first element, as normalize_serie does.
+
+    Args:
+    series (RaggedSeries): The series.
+    normalize (bool): False to keep the series as they are (e.g. for the output gap).
+
+    Returns:
+    RaggedSeries: The normalized series.
+    '''
+    return series.normalize() if normalize else series
+
+def average_pattern(series, durations, duration):
+    '''
+    Compute the average pattern of the series, as compute_pattern does.
+
+    Args:
+    series (RaggedSeries): The series.
+    durations (list): The duration of each crisis event.
+    duration (int): The length of the crises selected as in sweep.aligned_durations, or None for all the series.
+
+    Returns:
+    DataFrame: One row per position, with the 'pattern' and its number of 'data_points'.
+    '''
+    if duration is not None:
+        series = series.by_duration(sweep.aligned_durations(durations, len(series)), duration)
+    pattern, data_points = patterns.average_pattern(*patterns.padded_series(series))
+    return pd.DataFrame({'pattern': pattern, 'data_points': data_points})
+
+# The chain of the notebooks, from the raw csv files to the average pattern
+STAGES = [
+    Stage('crises', load_crises, files=('crises_path',)),
+    Stage('maddison', load_maddison, files=('maddison_path',)),
+    Stage('panel', build_panel, inputs=('crises', 'maddison'), params=('countries', 'how', 'smoothing_param')),
+    Stage('events', events.crisis_events, inputs=('panel',)),
+    Stage('durations', crisis_durations, inputs=('panel', 'events'), params=('method',)),
+    Stage('frequency', extraction_method_1.length_frequency, inputs=('durations',)),
+    Stage('series', extracted_series, inputs=('panel', 'events'), params=('method', 'variable', 'horizon')),
+    Stage('normalized', normalized_series, inputs=('series',), params=('normalize',)),
+    Stage('pattern', average_pattern, inputs=('normalized', 'durations'), params=('duration',)),
+]
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from events import crisis_events, panel_arrays
+from extraction import METHOD_1, series_rows
+from series import round_like_builtin
+from windows import gather_windows
+
+def placebo_test(data, column, policy=METHOD_1, draws=5000, mode='count', block_length=5, normalize=True, seed=0, batch_size=500):
+    '''
+    Test whether the average pattern of a column around the first years of crisis differs from the patterns around random dates.
+
+    Args:
+    data (DataFrame): The dataset created by concat_dataset and dummy_variable.
+    column (str): The column to extract, e.g. 'annual_inflation' or 'output_gap'.
+    policy (Policy, optional): The extraction method of extraction.py. Default is METHOD_1.
+    draws (int, optional): The number of random assignments of the first years of crisis. Default is 5000.
+    mode (str, optional): How the pseudo first years of crisis of each country are drawn. Default is 'count'.
+        - 'count': As many distinct years as the country has crises, drawn uniformly among its years.
+        - 'block': The years of the country are cut in blocks of block_length years, which are shuffled with the crises they contain.
+    block_length (int, optional): The length of the blocks in the 'block' mode. Default is 5.
+    normalize (bool, optional): True to subtract the first value of each serie and round, as normalize_serie does. Default is True.
+    seed (int, optional): The seed of the random draws. Default is 0.
+    batch_size (int, optional): The number of draws extracted at once. Default is 500.
+
+    Returns:
+    DataFrame: A DataFrame with one row per position ('ts-1', 'ts', 'ts+1', ...) and the following columns:
+        - 'observed': The average pattern around the actual first years of crisis, as compute_pattern computes it from the
+          extracted (and normalized) series, but NaN where no serie has a data point.
+        - 'placebo_mean': The average of the average patterns around the pseudo first years.
+        - 'lower', 'upper': The 2.5th and 97.5th percentiles of the average patterns around the pseudo first years.
+        - 'p_value': The two-sided permutation p-value of the observed pattern, NaN where the observed pattern is NaN.
+
+    The series around the pseudo first years follow the same rules as extraction.extract_series: they stop at the next pseudo
+    crisis of the country or at its end, and the excluded years and NaN values cut or drop them as the policy states.
+    The windows of all the pseudo crises of a batch of draws are located and averaged at once.
+    '''
+    events = crisis_events(data)
+    arrays = panel_arrays(data)
+    rule = policy.rule(column)
+    values = data[column].to_numpy(dtype=float, na_value=np.nan)
+
+    observed = _average_patterns(data, values, policy, rule, events, arrays, np.zeros(len(events), dtype=int), 1, normalize)[0]
+
+    # Countries with crises, their rows and their number of crises
+    countries = events.groupby('country_start', sort=False).agg(country_end=('country_end', 'first'), crises=('start', 'size'))
+    countries = countries.reset_index()
+
+    rng = np.random.default_rng(seed)
+    placebo = []
+    for start in range(0, draws, batch_size):
+        size = min(batch_size, draws - start)
+        pseudo, draw = _pseudo_events(countries, events, size, mode, block_length, rng)
+        placebo.append(_average_patterns(data, values, policy, rule, pseudo, arrays, draw, size, normalize))
+    placebo = np.concatenate(placebo)
+
+    # Two-sided p-values, from the distance of the patterns to the average placebo pattern (the draws without data point are left out)
+    placebo_mean = np.nanmean(placebo, axis=0)
+    extreme = np.abs(placebo - placebo_mean) >= np.abs(observed - placebo_mean)
+    p_value = (1 + extreme.sum(axis=0)) / (1 + (~np.isnan(placebo)).sum(axis=0))
+    # There is nothing to test where no actual crisis has a data point
+    p_value[np.isnan(observed)] = np.nan
+
+    lower, upper = np.nanpercentile(placebo, [2.5, 97.5], axis=0)
+    positions = ["ts-1", "ts"] + [f"ts+{k}" for k in range(1, policy.horizon + 1)]
+
+    return pd.DataFrame({'observed': observed, 'placebo_mean': placebo_mean, 'lower': lower, 'upper': upper, 'p_value': p_value},
+                        index=pd.Index(positions, name='position'))
+
+def _pseudo_events(countries, events, draws, mode, block_length, rng):
+    '''
+    Draw pseudo first years of crisis for each country.
+
+    Args:
+    countries (DataFrame): The 'country_start', 'country_end' and number of 'crises' of each country with crises.
+    events (DataFrame): The crisis event index of the dataset.
+    draws (int): The number of draws.
+    mode (str): 'count' or 'block', see placebo_test.
+    block_length (int): The length of the blocks in the 'block' mode.
+    rng (Generator): The random generator.
+
+    Returns:
+    DataFrame: The pseudo events of all the draws, with the columns of the event index used by windows.window_rows.
+    np.array: The draw of each pseudo event.
+    '''
+    starts, country_starts, country_ends = [], [], []
+    actual = events.groupby('country_start', sort=False)['start']
+
+    for country_start, country_end, crises in zip(countries['country_start'], countries['country_end'], countries['crises']):
+        length = country_end - country_start
+
+        if mode == 'count':
+            # The crises years of each draw are the years with the smallest random keys
+            keys = rng.random((draws, length))
+            offsets = np.argpartition(keys, crises - 1, axis=1)[:, :crises]
+        elif mode == 'block':
+            # Shuffle the blocks of each draw, and move the crises with their blocks
+            blocks = -(-length // block_length)
+            block_lengths = np.minimum(block_length, length - np.arange(blocks) * block_length)
+            order = np.argsort(rng.random((draws, blocks)), axis=1)
+            new_block_start = np.zeros((draws, blocks), dtype=int)
+            np.put_along_axis(new_block_start, order, np.cumsum(block_lengths[order], axis=1) - block_lengths[order], axis=1)
+            crisis_offsets = actual.get_group(country_start).to_numpy() - country_start
+            offsets = new_block_start[:, crisis_offsets // block_length] + crisis_offsets % block_length
+        else:
+            raise ValueError(f"Unknown mode: {mode}")
+
+        starts.append(np.sort(offsets, axis=1) + country_start)
+        country_starts.append(np.full(starts[-1].shape, country_start))
+        country_ends.append(np.full(starts[-1].shape, country_end))
+
+    # Pseudo events ordered by draw, then by country and year
+    start = np.concatenate(starts, axis=1)
+    country_start = np.concatenate(country_starts, axis=1)
+    country_end = np.concatenate(country_ends, axis=1)
+
+    # The next pseudo crisis of the same country, or the end of the country
+    next_crisis = country_end.copy()
+    same_country = country_start[:, 1:] == country_start[:, :-1]
+    next_crisis[:, :-1] = np.where(same_country, start[:, 1:], country_end[:, :-1])
+
+    pseudo = pd.DataFrame({'start': start.ravel(), 'next_crisis': next_crisis.ravel(),
+                           'country_start': country_start.ravel(), 'country_end': country_end.ravel()})
+    return pseudo, np.repeat(np.arange(draws), start.shape[1])
+
+def _average_patterns(data, values, policy, rule, events, arrays, draw, draws, normalize):
+    '''
+    Compute the average pattern of the series around the events of each draw.
+
+    Args:
+    data (DataFrame): The dataset.
+    values (np.array): The values of the extracted column.
+    policy (Policy): The extraction method.
+    rule (VariableRule): The rule of the extracted column.
+    events (DataFrame): The events of all the draws.
+    arrays (dict): The columns of the dataset from events.panel_arrays.
+    draw (np.array): The draw of each event.
+    draws (int): The number of draws.
+    normalize (bool): True to subtract the first value of each serie and round as normalize_serie.
+
+    Returns:
+    np.array: A (draws, horizon+2) array with the average pattern of each draw, NaN where a draw has no data point.
+    '''
+    rows, valid, kept = series_rows(data, policy, rule, events, arrays)
+    windows = gather_windows(values, rows)
+    valid &= kept[:, None]
+
+    if normalize:
+        # Rounded as normalize_serie does, so that the patterns are the ones of compute_pattern
+        first = np.argmax(valid, axis=1)
+        windows = round_like_builtin(windows - windows[np.arange(len(windows)), first][:, None])
+    valid &= ~np.isnan(windows)
+
+    sums = np.zeros((draws, windows.shape[1]))
+    counts = np.zeros((draws, windows.shape[1]))
+    for position in range(windows.shape[1]):
+        sums[:, position] = np.bincount(draw, weights=np.where(valid[:, position], windows[:, position], 0), minlength=draws)
+        counts[:, position] = np.bincount(draw, weights=valid[:, position], minlength=draws)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
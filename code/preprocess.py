@@ -1,5 +1,53 @@
 import pandas as pd
 
+# Columns of the Global Crises dataset used by the pipeline, with their names after preprocessing
+GLOBAL_CRISES_COLUMNS = {'CC3':'CC3',
+                         'Year':'Year',
+                         'Banking Crisis ':'banking_crisis',
+                         'Currency Crises':'currency_crisis',
+                         'Inflation Crises':'inflation_crisis',
+                         'Inflation, Annual percentages of average consumer prices':'annual_inflation'}
+
+# Types of the columns of the Global Crises dataset after loading
+GLOBAL_CRISES_SCHEMA = {'CC3':'category',
+                        'Year':'int16',
+                        'banking_crisis':'Int8',
+                        'currency_crisis':'Int8',
+                        'inflation_crisis':'Int8',
+                        'annual_inflation':'float32'}
+
+def load_global_crises_data(path, encoding='unicode_escape'):
+    '''
+    Load the columns of the global crises dataset used by the pipeline, already preprocessed.
+
+    Args:
+    path (str): The path of the csv file of the global crises dataset.
+    encoding (str, optional): The encoding of the file. Default is 'unicode_escape'.
+
+    Returns:
+    DataFrame: The dataset with the columns of GLOBAL_CRISES_COLUMNS, typed with GLOBAL_CRISES_SCHEMA.
+
+    The header row describing the columns is skipped while parsing and the other columns are never read.
+    The flags are nullable integers, with <NA> for the missing values, and the inflation rate is a float32.
+    '''
+    columns = list(GLOBAL_CRISES_COLUMNS)
+    numeric_columns = columns[2:]
+
+    try:
+        # Parse the numeric columns directly as numbers
+        dataset = pd.read_csv(path, encoding=encoding, usecols=columns, skiprows=[1],
+                              dtype={'CC3':'category', 'Year':'int16', **{column:'float32' for column in numeric_columns}})
+    except ValueError:
+        # Some cells of the numeric columns contain text (e.g. 'n/a'), so convert them after parsing
+        dataset = pd.read_csv(path, encoding=encoding, usecols=columns, skiprows=[1],
+                              dtype={'CC3':'category', 'Year':'int16'})
+        dataset[numeric_columns] = dataset[numeric_columns].apply(pd.to_numeric, errors='coerce')
+
+    # Rename columns for consistency and clarity
+    dataset.rename(columns=GLOBAL_CRISES_COLUMNS, inplace = True)
+
+    return dataset[list(GLOBAL_CRISES_SCHEMA)].astype(GLOBAL_CRISES_SCHEMA)
+
 def preprocess_global_crises_data(dataset):
     '''
     Preprocess the global crises dataset.
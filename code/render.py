@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+import cache
+from sweep import aligned_durations
+
+# Labels of the variables in the figures
+LABELS = {'annual_inflation': 'Inflation rate', 'output_gap': 'Output gap'}
+
+# File of the output directory recording the digest of the data of each figure
+MANIFEST = 'manifest.json'
+
+def figure_jobs(outputs, formats=('png',)):
+    '''
+    List the figures of the outputs of a sweep: one per crisis length and one for the dynamics of each scenario and variable.
+
+    Args:
+    outputs (dict): The outputs of each (group, method), as returned by sweep.sweep.
+    formats (tuple, optional): The file formats of the figures, e.g. ('png', 'svg'). Default is ('png',).
+
+    Returns:
+    list: One dict per figure with its file 'name', its 'kind' ('length' or 'dynamics'), the arguments of its plot function
+    and the 'digest' of everything it is drawn from. The names are deterministic, e.g. G20_method1_annual_inflation_2_years_crisis.png
+    and G20_method1_annual_inflation_dynamics.png.
+    '''
+    source = cache.file_digest(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'visualisation.py'))
+
+    jobs = []
+    for (group, method), variables in outputs.items():
+        for variable, output in variables.items():
+            string = LABELS.get(variable, variable)
+            prefix = f'{group}_method{method}_{variable}'
+            durations = aligned_durations(output['durations'], len(output['series']))
+
+            for length in output['frequency']['Length in years']:
+                # Only the series of the crises of this length are sent to the renderer
+                series = output['series'].by_duration(durations, length)
+                arguments = {'kind': 'length', 'series': series, 'durations': np.full(len(series), length),
+                             'frequency': output['frequency'], 'string': string, 'length': int(length)}
+                for file_format in formats:
+                    digest = _digest(source, file_format, string, int(length), series.values, series.offsets)
+                    jobs.append(dict(arguments, name=f'{prefix}_{length}_years_crisis.{file_format}', digest=digest))
+
+            arguments = {'kind': 'dynamics', 'crisis': output['crisis'], 'recovery': output['recovery'], 'string': string}
+            for file_format in formats:
+                digest = _digest(source, file_format, string, output['crisis'].values, output['crisis'].offsets,
+                                 output['recovery'].values, output['recovery'].offsets)
+                jobs.append(dict(arguments, name=f'{prefix}_dynamics.{file_format}', digest=digest))
+
+    return jobs
+
+def render_figures(outputs, directory='../figures', formats=('png',), processes=1, force=False):
+    '''
+    Render all the figures of the outputs of a sweep into a directory, without displaying them.
+
+    Args:
+    outputs (dict): The outputs of each (group, method), as returned by sweep.sweep.
+    directory (str, optional): The output directory. Default is '../figures'.
+    formats (tuple, optional): The file formats of the figures, e.g. ('png', 'svg'). Default is ('png',).
+    processes (int, optional): The number of processes sharing the figures. Default is 1.
+    force (bool, optional): True to render the figures whose data did not change too. Default is False.
+
+    Returns:
+    DataFrame: One row per figure with its 'name', its 'path' and its 'status', 'rendered' or 'skipped'.
+
+    The digest of the data of each figure is recorded in the manifest.json file of the directory, and a figure is skipped
+    when its file exists with the same digest. The figures are drawn with the Agg backend in worker processes, each process
+    reusing one figure per kind of plot.
+    '''
+    if processes < 1:
+        raise ValueError(f"The number of processes must be at least 1, not {processes}")
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    jobs = figure_jobs(outputs, formats)
+    todo = [job for job in jobs
+            if force or manifest.get(job['name']) != job['digest'] or not os.path.exists(os.path.join(directory, job['name']))]
+
+    # Share the figures among the processes. Even a single batch is drawn in a worker process, so that the backend and the
+    # style of the caller (e.g. the inline display of a notebook) are left unchanged
+    batches = [todo[i::processes] for i in range(processes) if todo[i::processes]]
+    if batches:
+        with ProcessPoolExecutor(len(batches)) as executor:
+            list(executor.map(_render_batch, batches, [directory] * len(batches)))
+
+    # Record the digests of the rendered figures
+    manifest.update({job['name']: job['digest'] for job in todo})
+    temporary = f'{manifest_path}.tmp{os.getpid()}'
+    with open(temporary, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temporary, manifest_path)
+
+    rendered = {job['name'] for job in todo}
+    return pd.DataFrame({'name': [job['name'] for job in jobs],
+                         'path': [os.path.join(directory, job['name']) for job in jobs],
+                         'status': ['rendered' if job['name'] in rendered else 'skipped' for job in jobs]})
+
+def _render_batch(jobs, directory):
+    '''
+    Draw and save a batch of figures with the Agg backend, in a worker process as it switches the backend of its process.
+
+    Args:
+    jobs (list): The figures from figure_jobs.
+    directory (str): The output directory.
+    '''
+    import matplotlib
+    matplotlib.use('Agg')
+    # The identifiers of the svg files only depend on their content
+    matplotlib.rcParams['svg.hashsalt'] = 'render'
+    import matplotlib.pyplot as plt
+    import visualisation
+
+    length_figure = plt.figure()
+    dynamics_figure = plt.figure(figsize=(8, 9))
+
+    for job in jobs:
+        if job['kind'] == 'length':
+            plt.figure(length_figure.number)
+            length_figure.clf()
+            visualisation.plot_by_crisis_length(job['series'], job['durations'], job['frequency'], job['string'], job['length'],
+                                                directory=None, show=False)
+            figure = length_figure
+        else:
+            visualisation.plot_dynamics(job['crisis'], job['recovery'], job['string'], fig=dynamics_figure)
+            figure = dynamics_figure
+
+        # Leave the date out of the svg files so that they are deterministic
+        metadata = {'Date': None} if job['name'].endswith('.svg') else None
+        figure.savefig(os.path.join(directory, job['name']), metadata=metadata)
+
+    plt.close(length_figure)
+    plt.close(dynamics_figure)
+
+def _digest(*parts):
+    '''
+    Hash the data of a figure.
+
+    Args:
+    *parts: Arrays and other values (hashed by their repr).
+
+    Returns:
+    str: The hexadecimal SHA-256 digest of the parts.
+    '''
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f'{part.dtype}{part.shape}'.encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+    return digest.hexdigest()
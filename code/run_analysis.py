@@ -0,0 +1,133 @@
+'''
+Run the analysis of the notebooks without interaction, e.g. from the code directory:
+
+    python -m run_analysis --groups G20 OECD --methods 1 2 --smoothing-param 6.25 --horizon 8 \
+        --output ../results --formats csv json --figures png svg
+
+The patterns and the frequency tables of all the groups and methods are written to the output directory, and the figures
+to its figures subdirectory when figure formats are given. The plotting libraries are only imported in that case.
+'''
+import argparse
+import importlib.util
+import os
+import sys
+import pandas as pd
+import sweep
+from pipeline import load_crises, load_maddison
+
+# Writers of the tables, by output format
+WRITERS = {'csv': lambda df, path: df.to_csv(path, index=False),
+           'parquet': lambda df, path: df.to_parquet(path, index=False),
+           'json': lambda df, path: df.to_json(path, orient='records', indent=1)}
+
+def positive_int(value):
+    '''
+    Convert a command-line value to a positive integer.
+
+    Args:
+    value (str): The value.
+
+    Returns:
+    int: The integer, at least 1.
+    '''
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, not {number}')
+    return number
+
+def parse_arguments(argv=None):
+    '''
+    Parse the command-line arguments.
+
+    Args:
+    argv (list, optional): The arguments, without the program name. Default is sys.argv[1:].
+
+    Returns:
+    Namespace: The parsed arguments.
+    '''
+    parser = argparse.ArgumentParser(prog='run_analysis', description='Average reaction of inflation and output gap to banking crises.')
+    parser.add_argument('--crises-path', default='../raw_data/global_crisis_data_country.csv', help='Global Crises dataset (csv).')
+    parser.add_argument('--maddison-path', default='../raw_data/gdp-per-capita-maddison.csv', help='Maddison GDP per capita dataset (csv).')
+    parser.add_argument('--groups', nargs='*', default=['G20'], choices=list(sweep.GROUPS) + ['ALL'], help='Country groups (none to only run the --countries).')
+    parser.add_argument('--countries', nargs='+', default=None, help='Country codes of an additional group named CUSTOM.')
+    parser.add_argument('--methods', nargs='+', type=int, default=[1, 2], choices=sorted(sweep.METHODS), help='Extraction methods.')
+    parser.add_argument('--smoothing-param', '--lambda', type=float, default=6.25, dest='smoothing_param',
+                        help='Smoothing parameter of the Hodrick-Prescott filter.')
+    parser.add_argument('--horizon', type=int, default=8, help='Number of years extracted after the first year of each crisis.')
+    parser.add_argument('--output', default='../results', help='Output directory.')
+    parser.add_argument('--formats', nargs='+', default=['csv'], choices=list(WRITERS), help='Formats of the tables.')
+    parser.add_argument('--figures', nargs='*', default=[], choices=['png', 'svg'], help='Formats of the figures (none by default).')
+    parser.add_argument('--processes', type=positive_int, default=1, help='Number of worker processes.')
+    parser.add_argument('--force', action='store_true', help='Render the figures whose data did not change too.')
+    arguments = parser.parse_args(argv)
+
+    # Fail before any output is written
+    if not arguments.groups and not arguments.countries:
+        parser.error('no group selected: give --groups or --countries')
+    if 'parquet' in arguments.formats and not any(importlib.util.find_spec(engine) for engine in ('pyarrow', 'fastparquet')):
+        parser.error('the parquet format requires pyarrow or fastparquet')
+    return arguments
+
+def frequency_rows(outputs):
+    '''
+    Gather the frequency tables of the outputs of a sweep in one tidy table.
+
+    Args:
+    outputs (dict): The outputs of each (group, method), as returned by sweep.sweep.
+
+    Returns:
+    DataFrame: One row per group, method, variable and crisis duration, with the 'count' of crises.
+    '''
+    frames = []
+    for (group, method), variables in outputs.items():
+        for variable, output in variables.items():
+            frequency = output['frequency'].rename(columns={'Length in years': 'duration', 'Count': 'count'})
+            frequency.insert(0, 'variable', variable)
+            frequency.insert(0, 'method', method)
+            frequency.insert(0, 'group', group)
+            frames.append(frequency)
+    return pd.concat(frames, ignore_index=True)
+
+def main(argv=None):
+    '''
+    Run the analysis from the command-line arguments.
+
+    Args:
+    argv (list, optional): The arguments, without the program name. Default is sys.argv[1:].
+
+    Returns:
+    int: The exit status.
+    '''
+    arguments = parse_arguments(argv)
+
+    main_data = load_crises(arguments.crises_path)
+    GDP_pc = load_maddison(arguments.maddison_path)
+
+    # Countries of the selected groups
+    groups = {group: sweep.GROUPS[group] for group in arguments.groups if group != 'ALL'}
+    if 'ALL' in arguments.groups:
+        groups['ALL'] = sweep.all_countries(main_data, GDP_pc)
+    if arguments.countries:
+        groups['CUSTOM'] = arguments.countries
+
+    results, outputs = sweep.sweep(main_data, GDP_pc, groups, tuple(arguments.methods), arguments.horizon,
+                                   arguments.smoothing_param, arguments.processes)
+
+    os.makedirs(arguments.output, exist_ok=True)
+    for name, table in (('patterns', results), ('counts', frequency_rows(outputs))):
+        for file_format in arguments.formats:
+            path = os.path.join(arguments.output, f'{name}.{file_format}')
+            WRITERS[file_format](table, path)
+            print(f'Wrote {path}')
+
+    if arguments.figures:
+        # Only figure runs import the plotting libraries
+        from render import render_figures
+        report = render_figures(outputs, os.path.join(arguments.output, 'figures'), tuple(arguments.figures),
+                                arguments.processes, arguments.force)
+        print(f"Figures: {(report['status'] == 'rendered').sum()} rendered, {(report['status'] == 'skipped').sum()} unchanged")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import numpy as np
+
+class RaggedSeries:
+    '''
+    A list of series of different lengths, stored as one flat buffer of values and the offsets of the series.
+
+    Attributes:
+    values (np.array): The float64 values of all the series, one series after the other.
+    offsets (np.array): The int64 positions where each series starts in values, followed by len(values).
+    events (DataFrame): The metadata of the event of each series (e.g. rows of events.crisis_events), or None.
+
+    It behaves like the list of lists returned by the extraction functions: len() gives the number of series, indexing with
+    an integer gives a series as an array and iterating yields the series, so every function taking a list of lists accepts it.
+    '''
+
+    def __init__(self, values, offsets, events=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.events = events
+
+    @classmethod
+    def from_lists(cls, lists, events=None):
+        '''
+        Create a RaggedSeries from a list of lists.
+
+        Args:
+        lists (list): A list of lists, where each sublist represents a series.
+        events (DataFrame, optional): The metadata of the event of each series. Default is None.
+
+        Returns:
+        RaggedSeries: The series of the list.
+        '''
+        lengths = [len(sublist) for sublist in lists]
+        values = np.concatenate([np.asarray(sublist, dtype=np.float64) for sublist in lists]) if lists else np.zeros(0)
+        return cls(values, np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))), events)
+
+    @classmethod
+    def from_windows(cls, windows, valid, kept=None, events=None):
+        '''
+        Create a RaggedSeries from the windows returned by windows.extract_windows.
+
+        Args:
+        windows (np.array): The (n_events, width) values of the windows.
+        valid (np.array): The (n_events, width) mask of the values that belong to the series.
+        kept (np.array, optional): False for the windows to leave out. Default is None to keep them all.
+        events (DataFrame, optional): The metadata of every window, filtered with kept. Default is None.
+
+        Returns:
+        RaggedSeries: The valid values of the kept windows.
+        '''
+        if kept is not None:
+            windows, valid = windows[kept], valid[kept]
+            if events is not None:
+                events = events[kept].reset_index(drop=True)
+        lengths = valid.sum(axis=1)
+        return cls(windows[valid], np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))), events)
+
+    @property
+    def lengths(self):
+        '''
+        np.array: The length of each series.
+        '''
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key):
+        # An integer gives a series, anything else (slice, boolean mask, positions) a RaggedSeries
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            return self.values[self.offsets[key]:self.offsets[key + 1]]
+        return self.select(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.values[self.offsets[i]:self.offsets[i + 1]]
+
+    def __repr__(self):
+        return f'RaggedSeries({len(self)} series, {len(self.values)} values)'
+
+    def to_lists(self):
+        '''
+        Convert the series to a list of lists.
+
+        Returns:
+        list: A list of lists, where each sublist represents a series.
+        '''
+        return [self.values[start:end].tolist() for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def select(self, key):
+        '''
+        Select some of the series.
+
+        Args:
+        key (slice, np.array or list): A slice, a boolean mask or positions of the series to select.
+
+        Returns:
+        RaggedSeries: The selected series, with their events.
+        '''
+        positions = np.arange(len(self))[key]
+        lengths = self.lengths[positions]
+
+        # Position in values of every selected value
+        starts = np.repeat(self.offsets[positions], lengths)
+        shifts = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        events = None if self.events is None else self.events.iloc[positions].reset_index(drop=True)
+        return RaggedSeries(self.values[starts + shifts], np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))), events)
+
+    def by_duration(self, crisis_duration, length):
+        '''
+        Select the series of the crises of a given duration.
+
+        Args:
+        crisis_duration (list): A list containing the duration of the crisis of each series.
+        length (int): The duration of the crises to select.
+
+        Returns:
+        RaggedSeries: The series of the crises lasting length years.
+        '''
+        return self.select(np.asarray(crisis_duration) == length)
+
+    def normalize(self, decimals=2):
+        '''
+        Normalize each series based on its first element.
+
+        Args:
+        decimals (int, optional): The number of decimals of the normalized values. Default is 2.
+
+        Returns:
+        RaggedSeries: The series minus their first element, rounded as the built-in round of normalize_serie.
+        '''
+        lengths = self.lengths
+        first_elements = self.values[self.offsets[:-1][lengths > 0]]
+        normalized = round_like_builtin(self.values - np.repeat(first_elements, lengths[lengths > 0]), decimals)
+        return RaggedSeries(normalized, self.offsets, self.events)
+
+    def to_padded(self, fill=np.nan):
+        '''
+        Convert the series to a padded matrix.
+
+        Args:
+        fill (float, optional): The value of the padding. Default is NaN.
+
+        Returns:
+        np.array: An (n_series, max_length) matrix with one series per row, padded with fill.
+        np.array: An (n_series, max_length) boolean mask of the values of the series.
+
+        When all the series have the same length the matrix is a view of values and nothing is copied,
+        otherwise the values are scattered in the matrix in one operation.
+        '''
+        lengths = self.lengths
+        width = lengths.max() if len(lengths) else 0
+        mask = np.arange(width) < lengths[:, None]
+
+        if len(lengths) and (lengths == width).all():
+            return self.values.reshape(len(lengths), width), mask
+
+        matrix = np.full((len(lengths), width), fill, dtype=np.float64)
+        matrix[mask] = self.values
+        return matrix, mask
+
+def round_like_builtin(values, decimals=2):
+    '''
+    Round an array of floats to the same values as the built-in round of each float.
+
+    Args:
+    values (np.array): The float values.
+    decimals (int, optional): The number of decimals. Default is 2.
+
+    Returns:
+    np.array: The rounded values.
+
+    np.round scales the values by 10**decimals before rounding, so the values close to a tie (e.g. 2.675, which is stored as
+    2.67499999...) can round the other way than with round, which rounds the exact stored value. Away from the ties both give
+    the same value, so only the values whose scaled fraction is within a few ulps of one half are rounded with round.
+    '''
+    values = np.asarray(values, dtype=float)
+    scaled = values * 10.0 ** decimals
+    rounded = np.round(values, decimals)
+
+    with np.errstate(invalid='ignore'):
+        near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= 8 * np.spacing(np.abs(scaled))
+    if near_tie.any():
+        rounded[near_tie] = [round(value, decimals) for value in values[near_tie].tolist()]
+    return rounded
@@ -0,0 +1,237 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+import extraction_method_1
+import extraction_method_2
+from dataset import concat_dataset, dummy_variable
+from events import crisis_events
+from extraction import METHOD_1, METHOD_2, extract_variables
+from patterns import average_pattern, padded_series
+
+# Lists of countries of the notebooks (ALL is built from the datasets by all_countries)
+GROUPS = {
+    'OECD': ['DEU', 'AUS', 'AUT', 'BEL', 'CAN', 'CHL', 'COL', 'KOR', 'DNK', 'ESP', 'USA', 'FIN', 'FRA', 'GRC', 'HUN', 'IRL', 'ISL',
+             'ITA', 'JPN', 'MEX', 'NOR', 'NZL', 'NLD', 'POL', 'PRT', 'GBR', 'SWE', 'CHE', 'TUR'],
+    'G7': ['CAN', 'FRA', 'DEU', 'ITA', 'JPN', 'GBR', 'USA'],
+    'G20': ['DEU', 'CAN', 'FRA', 'GBR', 'JPN', 'ITA', 'USA', 'ZAF', 'RUS', 'CHN', 'ARG', 'BRA', 'IND', 'KOR', 'MEX', 'TUR', 'IDN'],
+    'EU': ['DEU', 'FRA', 'AUT', 'BEL', 'DNK', 'ESP', 'NLD', 'POL', 'PRT', 'SWE'],
+    'USA': ['USA'],
+}
+
+# The extraction policy and the crisis duration function of each method
+METHODS = {
+    1: (METHOD_1, extraction_method_1.compute_crisis_duration),
+    2: (METHOD_2, extraction_method_2.compute_crisis_duration),
+}
+
+# As in the notebooks, the panel of each variable ('left' or 'inner' merge) and whether its series are normalized
+VARIABLES = {
+    'annual_inflation': ('left', True),
+    'output_gap': ('inner', False),
+}
+
+# Columns of the event index holding row positions
+POSITION_COLUMNS = ['start', 'end', 'next_crisis', 'recovery_end', 'country_start', 'country_end']
+
+def all_countries(main_data, GDP_pc):
+    '''
+    List the countries of both datasets, i.e. the ALL group of the notebooks.
+
+    Args:
+    main_data (DataFrame): The preprocessed Global Crises dataset.
+    GDP_pc (DataFrame): The preprocessed Maddison GDP per capita dataset.
+
+    Returns:
+    list: The sorted country codes present in both datasets.
+    '''
+    return sorted(set(main_data['CC3'].unique()) & set(GDP_pc['Code'].unique()))
+
+def build_panels(main_data, GDP_pc, countries, smoothing_param=6.25):
+    '''
+    Build the left and inner panels of a list of countries with their dummy variables and event indexes.
+
+    Args:
+    main_data (DataFrame): The preprocessed Global Crises dataset.
+    GDP_pc (DataFrame): The preprocessed Maddison GDP per capita dataset.
+    countries (list): List of country codes to include in the panels.
+    smoothing_param (float, optional): The smoothing parameter for the Hodrick-Prescott filter. Default is 6.25.
+
+    Returns:
+    dict: For 'left' and 'inner', the panel from concat_dataset and dummy_variable, and its event index from events.crisis_events.
+    '''
+    panels = {}
+    for how in ('left', 'inner'):
+        data = concat_dataset(main_data, GDP_pc, countries, how, smoothing_param)
+        dummy_variable(data)
+        panels[how] = (data, crisis_events(data))
+    return panels
+
+def slice_panel(data, events, countries):
+    '''
+    Restrict a panel and its event index to a list of countries.
+
+    Args:
+    data (DataFrame): The panel, with the rows of each country following each other.
+    events (DataFrame): The event index of the panel from events.crisis_events.
+    countries (list): List of country codes to keep.
+
+    Returns:
+    DataFrame: The rows of the countries, ordered as in the list like concat_dataset does.
+    DataFrame: The event index of the restricted panel.
+
+    The outputs of concat_dataset, dummy_variable and crisis_events only depend on the rows of each country, so the slice is the
+    same as the panel built for the list itself, and the events only need to move with the rows of their country.
+    '''
+    # Rows of the countries, ordered as in the list
+    country_position = pd.Index(countries).unique().get_indexer(np.asarray(data['CC3']))
+    rows = np.flatnonzero(country_position >= 0)
+    rows = rows[np.argsort(country_position[rows], kind='stable')]
+
+    new_position = np.full(len(data), -1)
+    new_position[rows] = np.arange(len(rows))
+
+    # Move the events of each kept country by the shift of its first row
+    events = events[new_position[events['country_start'].to_numpy()] >= 0].copy()
+    shift = new_position[events['country_start'].to_numpy()] - events['country_start'].to_numpy()
+    for column in POSITION_COLUMNS:
+        events[column] = events[column].to_numpy() + shift
+
+    return data.iloc[rows].reset_index(drop=True), events.sort_values('start', kind='stable').reset_index(drop=True)
+
+def run_scenario(group, method, panels, horizon=8):
+    '''
+    Compute the frequency tables, series and average patterns of one country group with one extraction method.
+
+    Args:
+    group (str): The name of the country group.
+    method (int): The extraction method, 1 or 2.
+    panels (dict): The 'left' and 'inner' panels of the group and their event indexes, as built by build_panels.
+    horizon (int, optional): The number of years extracted after the first year of each crisis. Default is 8.
+
+    Returns:
+    DataFrame: The rows of the results table of sweep for this scenario.
+    dict: For each variable, a dict with:
+        - 'durations': The crisis durations from compute_crisis_duration.
+        - 'frequency': The frequency table from length_frequency.
+        - 'series', 'crisis', 'recovery': The RaggedSeries around ts and of the crisis and recovery dynamics,
+          normalized as in the notebooks.
+    '''
+    policy, compute_crisis_duration = METHODS[method]
+    policy = replace(policy, horizon=horizon)
+
+    rows = []
+    outputs = {}
+    for variable, (how, normalize) in VARIABLES.items():
+        data, events = panels[how]
+        durations = compute_crisis_duration(data, events)
+        frequency = extraction_method_1.length_frequency(durations)
+
+        extracted = extract_variables(data, [variable], policy, events, ragged=True)[variable]
+        if normalize:
+            extracted = {phase: series.normalize() for phase, series in extracted.items()}
+        outputs[variable] = dict(extracted, durations=durations, frequency=frequency)
+
+        # Patterns around ts of each crisis length, with the series selected as in plot_all_crisis_length
+        aligned = aligned_durations(durations, len(extracted['series']))
+        patterns = [_pattern_rows(extracted['series'].by_duration(aligned, length), 'series', int(length), -1)
+                    for length in frequency['Length in years']]
+
+        # Patterns of the crisis (from ts-1) and recovery (from te) dynamics
+        patterns.append(_pattern_rows(extracted['crisis'], 'crisis', pd.NA, -1))
+        patterns.append(_pattern_rows(extracted['recovery'], 'recovery', pd.NA, 0))
+
+        patterns = pd.concat(patterns, ignore_index=True)
+        patterns.insert(0, 'variable', variable)
+        rows.append(patterns)
+
+    results = pd.concat(rows, ignore_index=True)
+    results.insert(0, 'method', method)
+    results.insert(0, 'group', group)
+    return results, outputs
+
+def sweep(main_data, GDP_pc, groups=None, methods=(1, 2), horizon=8, smoothing_param=6.25, processes=1):
+    '''
+    Run the analysis of the notebooks for several country groups and extraction methods in one call.
+
+    Args:
+    main_data (DataFrame): The preprocessed Global Crises dataset.
+    GDP_pc (DataFrame): The preprocessed Maddison GDP per capita dataset.
+    groups (dict, optional): The list of country codes of each group. Default is GROUPS with the ALL group.
+    methods (tuple, optional): The extraction methods, 1 and/or 2. Default is (1, 2).
+    horizon (int, optional): The number of years extracted after the first year of each crisis. Default is 8.
+    smoothing_param (float, optional): The smoothing parameter for the Hodrick-Prescott filter. Default is 6.25.
+    processes (int, optional): The number of processes sharing the scenarios. Default is 1.
+
+    Returns:
+    DataFrame: The tidy results table, with one row per group, method, variable, phase, duration and horizon, and the columns:
+        - 'group', 'method', 'variable': The scenario and the extracted variable.
+        - 'phase': 'series' for the series around ts, 'crisis' and 'recovery' for the dynamics.
+        - 'duration': The crisis length of the series around ts, missing for the dynamics.
+        - 'horizon': The year relative to ts (-1 for ts-1), or to te for the recovery dynamics.
+        - 'pattern', 'data_points': The average pattern and its number of data points, as in compute_pattern.
+        - 'observations': The number of series averaged.
+    dict: The outputs of run_scenario of each (group, method).
+
+    The left and inner panels of all the countries of the groups, and their event indexes, are built once. Each group is a slice
+    of them, the same as the panel built for the group itself. The scenarios then run on a pool of processes.
+    '''
+    if groups is None:
+        groups = dict(GROUPS, ALL=all_countries(main_data, GDP_pc))
+
+    # Panels of the union of the groups, sliced for each group
+    union = list(pd.Index([country for countries in groups.values() for country in countries]).unique())
+    panels = build_panels(main_data, GDP_pc, union, smoothing_param)
+    group_panels = {group: {how: slice_panel(data, events, countries) for how, (data, events) in panels.items()}
+                    for group, countries in groups.items()}
+
+    scenarios = [(group, method) for group in groups for method in methods]
+    arguments = [(group, method, group_panels[group], horizon) for group, method in scenarios]
+
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            outputs = list(executor.map(run_scenario, *zip(*arguments)))
+    else:
+        outputs = [run_scenario(*argument) for argument in arguments]
+
+    results = pd.concat([result for result, _ in outputs], ignore_index=True)
+    results['duration'] = results['duration'].astype('Int64')
+    return results, {scenario: output for scenario, (_, output) in zip(scenarios, outputs)}
+
+def aligned_durations(durations, n_series):
+    '''
+    Align the crisis durations with the series, as select_by_crisis_length pairs them.
+
+    Args:
+    durations (list): The duration of each crisis event from compute_crisis_duration.
+    n_series (int): The number of series.
+
+    Returns:
+    np.array: The duration paired with each series, 0 for the series beyond the last duration (never selected).
+    '''
+    aligned = np.zeros(n_series, dtype=int)
+    aligned[:min(len(durations), n_series)] = durations[:n_series]
+    return aligned
+
+def _pattern_rows(series, phase, duration, first_horizon):
+    '''
+    Compute the average pattern of series as rows of the results table.
+
+    Args:
+    series (RaggedSeries): The series to average.
+    phase (str): The phase of the series.
+    duration (int): The crisis length of the series, or pd.NA.
+    first_horizon (int): The horizon of the first position of the series.
+
+    Returns:
+    DataFrame: One row per position, with the phase, duration, horizon, pattern, data_points and observations columns.
+    '''
+    pattern, data_points = average_pattern(*padded_series(series))
+    return pd.DataFrame({
+        'phase': phase,
+        'duration': pd.array([duration] * len(pattern), dtype='Int64'),
+        'horizon': np.arange(len(pattern)) + first_horizon,
+        'pattern': pattern,
+        'data_points': data_points,
+        'observations': len(series),
+    })
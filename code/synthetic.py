@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+def synthetic_datasets(n_countries=20, n_years=200, last_year=2016, seed=0, banking_hazard=0.05, banking_duration=2.5,
+                       inflation_hazard=0.02, inflation_duration=2.0, currency_hazard=0.03, currency_duration=1.5,
+                       nan_gap_rate=0.02, max_nan_gap=5, missing_flag_rate=0.005, start_spread=60, gdp_start_spread=80,
+                       gdp_gap_rate=0.02):
+    '''
+    Generate random datasets with the schema of the Global Crises and Maddison datasets after preprocessing.
+
+    Args:
+    n_countries (int, optional): The number of countries. Default is 20.
+    n_years (int, optional): The largest number of years of a country, ending at last_year. Default is 200.
+    last_year (int, optional): The last year of every country. Default is 2016.
+    seed (int, optional): The seed of the random draws. Default is 0.
+    banking_hazard (float, optional): The probability that a banking crisis starts in a year. Default is 0.05.
+    banking_duration (float, optional): The mean duration of a banking crisis in years (geometric). Default is 2.5.
+    inflation_hazard (float, optional): The probability that an inflation crisis starts in a year. Default is 0.02.
+    inflation_duration (float, optional): The mean duration of an inflation crisis in years. Default is 2.0.
+    currency_hazard (float, optional): The probability that a currency crisis starts in a year. Default is 0.03.
+    currency_duration (float, optional): The mean duration of a currency crisis in years. Default is 1.5.
+    nan_gap_rate (float, optional): The probability that a gap of missing inflation rates starts in a year. Default is 0.02.
+    max_nan_gap (int, optional): The longest gap of missing inflation rates. Default is 5.
+    missing_flag_rate (float, optional): The probability that a crisis flag is missing. Default is 0.005.
+    start_spread (int, optional): The first year of each country is drawn among the start_spread first years. Default is 60.
+    gdp_start_spread (int, optional): The GDP per capita of each country starts up to gdp_start_spread years later. Default is 80.
+    gdp_gap_rate (float, optional): The probability that a year of GDP per capita is missing. Default is 0.02.
+
+    Returns:
+    DataFrame: The crises dataset, as main_data after preprocess_global_crises_data (index from 1, columns 'Case', 'CC3',
+        'Country', 'Year', 'banking_crisis', 'notes', 'systemic_crisis', 'gold_standard', 'annual_inflation',
+        'currency_crisis' and 'inflation_crisis'; the other columns of the raw file are never used and left out).
+    DataFrame: The GDP per capita dataset, as GDP_pc after preprocess_mdp_data ('Entity', 'Code', 'Year', 'GDP_per_capita').
+
+    Every draw is vectorized over the whole panel, so the datasets of 10,000 countries over 500 years are generated in seconds.
+    Inflation jumps during inflation crises, and GDP per capita grows more slowly during banking crises, so the average
+    patterns have a shape to measure.
+    '''
+    rng = np.random.default_rng(seed)
+
+    # Years of each country, all ending at last_year
+    first_year = last_year - n_years + 1 + rng.integers(0, max(min(start_spread, n_years), 1), n_countries)
+    lengths = last_year - first_year + 1
+    country = np.repeat(np.arange(n_countries), lengths)
+    country_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    country_end = country_start + np.repeat(lengths, lengths)
+    year = np.repeat(first_year, lengths) + np.arange(len(country)) - country_start
+
+    banking_crisis = _episodes(rng, country_end, banking_hazard, banking_duration)
+    inflation_crisis = _episodes(rng, country_end, inflation_hazard, inflation_duration)
+    currency_crisis = _episodes(rng, country_end, currency_hazard, currency_duration)
+
+    # Inflation rates, higher during inflation crises, with gaps of missing values
+    annual_inflation = np.round(rng.normal(5, 6, len(country)) + 40 * inflation_crisis, 2)
+    gap_length = rng.integers(1, max_nan_gap + 1, len(country))
+    gaps = _cover(rng.random(len(country)) < nan_gap_rate, gap_length, country_end)
+    annual_inflation[gaps] = np.nan
+
+    flags = [banking_crisis.astype(float), currency_crisis.astype(float), inflation_crisis.astype(float)]
+    for flag in flags:
+        flag[rng.random(len(country)) < missing_flag_rate] = np.nan
+
+    codes = np.array([f'C{i:0{len(str(max(n_countries - 1, 1)))}d}' for i in range(n_countries)], dtype=object)
+    names = np.array([f'Country {i}' for i in range(n_countries)], dtype=object)
+
+    main_data = pd.DataFrame({
+        'Case': country.astype(float) + 1,
+        'CC3': codes[country],
+        'Country': names[country],
+        'Year': year.astype('int64'),
+        'banking_crisis': flags[0],
+        'notes': np.where(banking_crisis, 'Synthetic banking crisis', None),
+        'systemic_crisis': flags[0].copy(),
+        'gold_standard': None,
+        'annual_inflation': annual_inflation,
+        'currency_crisis': flags[1],
+        'inflation_crisis': flags[2],
+    }, index=pd.RangeIndex(1, len(country) + 1))
+
+    # GDP per capita: log growth slowed by banking crises, cumulated within each country
+    growth = rng.normal(0.02, 0.04, len(country)) - 0.05 * banking_crisis
+    log_gdp = np.cumsum(growth)
+    log_gdp -= np.concatenate(([0], log_gdp))[country_start]
+    gdp_per_capita = np.round(np.exp(log_gdp + np.repeat(rng.normal(7.5, 0.5, n_countries), lengths)), 4)
+
+    # The GDP series start later than the crisis data and have missing years
+    gdp_first_year = first_year + rng.integers(0, max(gdp_start_spread, 1), n_countries)
+    kept = (year >= gdp_first_year[country]) & (rng.random(len(country)) >= gdp_gap_rate)
+
+    GDP_pc = pd.DataFrame({
+        'Entity': names[country[kept]],
+        'Code': codes[country[kept]],
+        'Year': year[kept].astype('int64'),
+        'GDP_per_capita': gdp_per_capita[kept],
+    })
+
+    return main_data, GDP_pc
+
+def _episodes(rng, country_end, hazard, mean_duration):
+    '''
+    Draw crisis episodes: each year starts an episode with probability hazard, lasting a geometric number of years.
+
+    Args:
+    rng (Generator): The random generator.
+    country_end (np.array): The row position following the last row of the country of each row.
+    hazard (float): The probability that an episode starts in a year.
+    mean_duration (float): The mean duration of an episode in years.
+
+    Returns:
+    np.array: True for the years of an episode. Overlapping episodes merge, and no episode extends to the next country.
+    '''
+    n = len(country_end)
+    starts = rng.random(n) < hazard
+    durations = rng.geometric(1 / max(mean_duration, 1), n)
+    return _cover(starts, durations, country_end)
+
+def _cover(starts, lengths, country_end):
+    '''
+    Mark the rows covered by runs starting at some rows.
+
+    Args:
+    starts (np.array): True for the rows where a run starts.
+    lengths (np.array): The length of the run starting at each row.
+    country_end (np.array): The row position following the last row of the country of each row, where the runs stop.
+
+    Returns:
+    np.array: True for the rows covered by at least one run.
+    '''
+    n = len(starts)
+    positions = np.flatnonzero(starts)
+    ends = np.minimum(positions + lengths[positions], country_end[positions])
+
+    # Count the runs covering each row with a difference array
+    changes = np.bincount(positions, minlength=n + 1) - np.bincount(ends, minlength=n + 1)
+    return np.cumsum(changes[:n]) > 0
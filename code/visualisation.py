@@ -1,72 +1,117 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
 import numpy as np
+from patterns import average_pattern, padded_series, pattern_statistics
+from series import RaggedSeries
+
+def plotting_libraries():
+    '''
+    Import the plotting libraries on first use, so that importing this module for compute_pattern stays fast.
+
+    Returns:
+    - module: matplotlib.pyplot.
+    - module: seaborn.
+    '''
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
 
 def compute_pattern(list):
     '''
     Computes the average pattern and number of data points for each position in the given list of lists.
 
     Args:
-    - lst (list): A list of lists, where each sublist represents a series of data.
+    - lst (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
 
     Returns:
     - np.array: An array representing the average pattern across all sublists.
     - list: A list containing the number of data points for each position in the pattern.
     '''
+    # Average the series at once on their padded matrix (see patterns.pattern_statistics for the other statistics)
+    pattern, nb_data_points = average_pattern(*padded_series(list))
+
+    return pattern, nb_data_points.tolist()
 
-    nb_data_points = []
-    max_length = max(len(sublist) for sublist in list)
+def select_by_crisis_length(series, crisis_duration, length):
+    '''
+    Selects the series of the banking crises of a given length.
 
-    # Initialize an array for the average pattern
-    pattern = np.zeros(max_length)
+    Args:
+    - series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
+    - crisis_duration (list): A list containing the duration of each crisis in years.
+    - length (int): The length of the crises to select.
+
+    Returns:
+    - list or RaggedSeries: The series of the crises lasting length years, in the same container as series.
+    '''
+    if isinstance(series, RaggedSeries):
+        return series.by_duration(np.asarray(crisis_duration)[:len(series)], length)
+
+    series_by_crisis_length = []
+    for j in range (0,len(series)):
+        if crisis_duration[j] == length:
+            series_by_crisis_length.append(series[j])
+    return series_by_crisis_length
+
+def plot_confidence_interval(ax, series, average_pattern):
+    '''
+    Shades the 95% confidence interval of an average pattern, from the standard error of the mean at each position.
 
-    # Iterate through each position in the pattern
-    for i in range(max_length):
-        # Initialize variables for the sum and length for each position
-        col_sum = 0
-        length = 0
+    Args:
+    - ax (Axes): The axes of the plot.
+    - series (list or RaggedSeries): The series from which the average pattern is computed.
+    - average_pattern (np.array): The average pattern, from compute_pattern.
+    '''
+    confidence_interval = 1.96 * pattern_statistics(series, quantiles=())['sem'].to_numpy()
+    ax.fill_between(range(len(average_pattern)), average_pattern - confidence_interval, average_pattern + confidence_interval,
+                    alpha=0.2, label='95% confidence interval')
 
-        # Iterate through each sublist
-        for sublist in list:
-            # Check if the current sublist has a value at the current position
-            if i < len(sublist):
-                col_sum += sublist[i]
-                length += 1
+def plot_bands(ax, bands, color=None):
+    '''
+    Shades the bootstrap percentile bands of an average pattern.
 
-        # Calculate the mean for the current position
-        mean = col_sum / length if length > 0 else 0
+    Args:
+    - ax (Axes): The axes of the plot.
+    - bands (DataFrame): The bands, with 'lower' and 'upper' columns, from bootstrap.bootstrap_pattern.
+    - color (str, optional): The color of the bands. Default is None for the color of the axes.
+    '''
+    ax.fill_between(range(len(bands)), bands['lower'], bands['upper'], color=color, alpha=0.2, label='Bootstrap band')
 
-        # Set the mean in the average pattern array
-        pattern[i] = mean
-        nb_data_points.append(length)
+def figure_name(string, desired_length):
+    '''
+    Name the file of the figure of the reaction of a variable to banking crises of a given length.
 
-    return pattern, nb_data_points
+    Args:
+    - string (str): A string indicating the variable being plotted (e.g., "Inflation rate", "Output gap").
+    - desired_length (int): The length of the banking crises.
 
+    Returns:
+    - str: The file name without extension, e.g. inflation_to_2_years_crisis or output_gap_to_2_years_crisis.
+    '''
+    variable = 'inflation' if string == 'Inflation rate' else string.lower().replace(' ', '_')
+    return f'{variable}_to_{desired_length}_years_crisis'
 
-def plot_all_crisis_length(series, crisis_duration, frequency_table, string):
+def plot_all_crisis_length(series, crisis_duration, frequency_table, string, confidence_interval=False, bands=None):
     '''
     Plots the average reaction of a list of lists to banking crises of different lengths.
 
     Args:
-    - series (list): A list of lists, where each sublist represents a series of data.
+    - series (list or RaggedSeries): A list of lists, where each sublist represents a series of data.
     - crisis_duration (list): A list containing the duration of each crisis in years.
     - frequency_table (DataFrame): A DataFrame containing the frequency of each crisis duration.
     - string (str): A string indicating the variable being plotted (e.g., "Inflation rate", "Output gap").
+    - confidence_interval (bool, optional): True to shade the 95% confidence interval of the average pattern. Default is False.
+    - bands (dict, optional): The bootstrap bands of each crisis length, from bootstrap.bootstrap_by_crisis_length. Default is None.
     '''
+    plt, sns = plotting_libraries()
 
     # Loop through each crisis duration in the frequency table
     for i in frequency_table['Length in years']:
-        series_by_crisis_length = []
-
-        #Appending the series for single year crisis
-        for j in range (0,len(series)):
-            if crisis_duration[j] == i:
-                series_by_crisis_length.append(series[j])
+        #Selecting the series of the crises of this length
+        series_by_crisis_length = select_by_crisis_length(series, crisis_duration, i)
 
         # Compute the average pattern and number of data points for the current crisis duration
         number_of_observations = len(series_by_crisis_length)
         average_pattern, number_of_data_points = compute_pattern(series_by_crisis_length)
-        # confidence_interval = 1.96 * np.std(normalize_crisis_data(series_by_crisis_length, axis=0) / np.sqrt(series_by_crisis_length.shape[0])
 
         # Define years for x-axis labeling
         years = [f"ts{k}" if k < 0
@@ -80,6 +125,10 @@ def plot_all_crisis_length(series, crisis_duration, frequency_table, string):
         sns.set_style("whitegrid")
         sns.lineplot(x = years, y = average_pattern, marker='o', alpha=0.9, label='Average Trend')
         sns.lineplot(x = years[1:1+i], y = average_pattern[1:1+i], marker='s', color='red', label = 'Crisis period')  # Change marker color to red for example
+        if confidence_interval:
+            plot_confidence_interval(plt.gca(), series_by_crisis_length, average_pattern)
+        if bands is not None and i in bands:
+            plot_bands(plt.gca(), bands[i])
 
         # Add horizontal line at y=0 and annotations for number of data points
         plt.axhline(y=0, color='black', label='y=0', linestyle = 'dashed', alpha = 0.6)
@@ -105,33 +154,34 @@ def plot_all_crisis_length(series, crisis_duration, frequency_table, string):
 
         plt.show()
 
-def plot_by_crisis_length(series, crisis_duration, frequency_table, string, desired_length):
+def plot_by_crisis_length(series, crisis_duration, frequency_table, string, desired_length, confidence_interval=False, bands=None,
+                          directory='../figures', show=True):
     '''
     Plots the average reaction of a list of lists to banking crises of a specified length.
 
     Args:
-    - series (list): A list of lists, where each sublist represents a series of inflation rate or output gap.
+    - series (list or RaggedSeries): A list of lists, where each sublist represents a series of inflation rate or output gap.
     - crisis_duration (list): A list containing the duration of each crisis in years.
     - frequency_table (DataFrame): A DataFrame containing the frequency of each crisis duration.
     - string (str): A string indicating the variable being plotted (e.g., "Inflation rate", "Output gap").
     - desired_length (int): The desired length of the banking crisis to plot.
+    - confidence_interval (bool, optional): True to shade the 95% confidence interval of the average pattern. Default is False.
+    - bands (DataFrame, optional): The bootstrap bands of the crises of desired length, from bootstrap.bootstrap_pattern. Default is None.
+    - directory (str, optional): The directory where the figure is saved under figure_name, or None to not save it. Default is '../figures'.
+    - show (bool, optional): False to leave the figure open instead of showing it, e.g. to save it elsewhere. Default is True.
     '''
+    plt, sns = plotting_libraries()
 
     i = desired_length #Reassign the desired_length to a variable i for convenience
 
     # Check if the desired length is in the frequency table
     if i in frequency_table['Length in years'].tolist():
-        series_by_crisis_length = []
-
-        #Appending the series for single year crisis
-        for j in range (0,len(series)):
-            if crisis_duration[j] == i:
-                series_by_crisis_length.append(series[j])
+        #Selecting the series of the crises of this length
+        series_by_crisis_length = select_by_crisis_length(series, crisis_duration, i)
 
         # Compute the average pattern and number of data points for the crises of desired length
         number_of_observations = len(series_by_crisis_length)
         average_pattern, number_of_data_points = compute_pattern(series_by_crisis_length)
-        # confidence_interval = 1.96 * np.std(normalize_crisis_data(series_by_crisis_length, axis=0) / np.sqrt(series_by_crisis_length.shape[0])
 
         # Define years for x-axis labeling
         years = [f"ts{k}" if k < 0
@@ -145,6 +195,10 @@ def plot_by_crisis_length(series, crisis_duration, frequency_table, string, desi
         sns.set_style("whitegrid")
         sns.lineplot(x = years, y = average_pattern, marker='o', alpha=0.9, label='Average Pattern')
         sns.lineplot(x = years[1:1+i], y = average_pattern[1:1+i], marker='s', color='red', label = 'Crisis period')  # Change marker color to red for example
+        if confidence_interval:
+            plot_confidence_interval(plt.gca(), series_by_crisis_length, average_pattern)
+        if bands is not None:
+            plot_bands(plt.gca(), bands)
         plt.axhline(y=0, color='black', linestyle = 'dashed', alpha = 0.6)
 
 
@@ -168,33 +222,46 @@ def plot_by_crisis_length(series, crisis_duration, frequency_table, string, desi
 
         plt.xlabel('Time in years')
         plt.ylim(-10, 10)
-        plt.savefig(f'../figures/inflation_to_{desired_length}_years_crisis')
-        plt.show()
+        if directory is not None:
+            plt.savefig(os.path.join(directory, figure_name(string, desired_length)))
+        if show:
+            plt.show()
     else:
         print("Error: The database does not contain any examples of banking crises of the specified duration.")
 
-def plot_dynamics(crisis_series, recovery_series, string):
+def plot_dynamics(crisis_series, recovery_series, string, crisis_bands=None, recovery_bands=None, fig=None):
     '''
     Plots the dynamics of inflation rates during crisis and recovery periods.
 
     Args:
-    - crisis_series (list): List of lists containing inflation series during crisis periods.
-    - recovery_series (list): List of lists containing inflation series during recovery periods.
+    - crisis_series (list or RaggedSeries): List of lists containing inflation series during crisis periods.
+    - recovery_series (list or RaggedSeries): List of lists containing inflation series during recovery periods.
     - string (str): The string indicating the type of data being plotted (Inflation rate or Output gap).
+    - crisis_bands (DataFrame, optional): The bootstrap bands of the crisis series, from bootstrap.bootstrap_pattern. Default is None.
+    - recovery_bands (DataFrame, optional): The bootstrap bands of the recovery series, from bootstrap.bootstrap_pattern. Default is None.
+    - fig (Figure, optional): A figure to clear and draw on instead of creating a new one. Default is None.
 
     Returns:
     None
     '''
+    plt, sns = plotting_libraries()
+
     #Compute the average response pattern by time elapsed with normalizing the inflation series
     average_pattern_during_crisis, number_of_data_points_during_crisis  = compute_pattern(crisis_series)
     average_pattern_during_recovery, number_of_data_points_during_recovery = compute_pattern(recovery_series)
 
-    fig, axs = plt.subplots(2, 1, figsize=(8,9), sharey = True)
+    if fig is None:
+        fig, axs = plt.subplots(2, 1, figsize=(8,9), sharey = True)
+    else:
+        fig.clf()
+        axs = fig.subplots(2, 1, sharey = True)
 
     #Plot the crisis trend
 
     years = [f"ts{i}" if i < 0 else f"ts+{i}" if i > 0 else "ts" for i in range(-1, len(average_pattern_during_crisis) - 1)]
     sns.lineplot(ax = axs[0], x = years, y = average_pattern_during_crisis, marker = 's', label = 'Average response')
+    if crisis_bands is not None:
+        plot_bands(axs[0], crisis_bands)
     # Add data points count to the plot
     offset = 0.1
     for m in range(len(average_pattern_during_crisis)):
@@ -214,6 +281,8 @@ def plot_dynamics(crisis_series, recovery_series, string):
 
     years = [f"te+{i}" if i > 0 else "te" for i in range(0, len(average_pattern_during_recovery))]
     sns.lineplot(ax=axs[1], x = years, y = average_pattern_during_recovery, marker = 's', color = 'Purple', alpha = 0.9, label = 'Average trend')
+    if recovery_bands is not None:
+        plot_bands(axs[1], recovery_bands, color = 'Purple')
     # Add data points count to the plot
     offset = 0.3
     for m in range(0, min(14, len(average_pattern_during_recovery))):
@@ -234,6 +303,6 @@ def plot_dynamics(crisis_series, recovery_series, string):
         axs[1].set_xlim( -0.5,'te+13')
 
     # Separate the two subplots
-    plt.subplots_adjust(hspace=0.25)
+    fig.subplots_adjust(hspace=0.25)
     # Add a text
     fig.text(0.12, 0, 'The number of points from which the average is calculated is diplayed above each point.', ha='left', va='bottom',style = 'italic', fontsize=10, color = 'gray')
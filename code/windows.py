@@ -0,0 +1,129 @@
+import numpy as np
+from events import column_array, crisis_events, panel_arrays
+from series import RaggedSeries
+
+def extract_windows(data, column, events=None, horizon=8, nan_column=None, check_years=False, drop_on_excluded=False, arrays=None):
+    '''
+    Extract the values of a column from ts-1 to ts+horizon around the first year (ts) of each crisis event.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    column (str): The column to extract (e.g. 'annual_inflation' or 'output_gap').
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    horizon (int, optional): The number of years extracted after ts. Default is 8.
+    nan_column (str, optional): A column whose NaN values stop the windows like an excluded year, or None. Default is None.
+    check_years (bool, optional): True to stop the windows at the first missing year of the country. Default is False.
+    drop_on_excluded (bool, optional): False to cut the windows at the first excluded year (or NaN value), True to drop
+        the windows containing one before they reach another crisis or the end of the country. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    np.array: An (n_events, horizon+2) float array with the values from ts-1 to ts+horizon of each event.
+    np.array: An (n_events, horizon+2) boolean mask of the values that belong to the series of each event.
+    np.array: An (n_events,) boolean array, False for the events whose window is dropped.
+
+    All the windows are gathered with one fancy-indexing operation on the rows of window_rows.
+    '''
+    if arrays is None:
+        arrays = panel_arrays(data)
+    rows, valid, kept = window_rows(data, events, horizon, nan_column, check_years, drop_on_excluded, arrays)
+    return gather_windows(column_array(data, arrays, column), rows), valid, kept
+
+def gather_windows(values, rows):
+    '''
+    Gather the values of a column in the windows located by window_rows.
+
+    Args:
+    values (np.array): The values of the column.
+    rows (np.array): The (n_events, horizon+2) row positions of the windows, from window_rows.
+
+    Returns:
+    np.array: The (n_events, horizon+2) values of the windows.
+    '''
+    return values[rows] if len(values) else np.full(rows.shape, np.nan)
+
+def window_rows(data, events=None, horizon=8, nan_column=None, check_years=False, drop_on_excluded=False, arrays=None):
+    '''
+    Locate the rows from ts-1 to ts+horizon around the first year (ts) of each crisis event, and the rows belonging to the series.
+
+    Args:
+    data (DataFrame): The dataset containing crisis event information.
+    events (DataFrame, optional): The crisis event index of the dataset from events.crisis_events, built if not given.
+    horizon (int, optional): The number of years extracted after ts. Default is 8.
+    nan_column (str, optional): A column whose NaN values stop the windows like an excluded year, or None. Default is None.
+    check_years (bool, optional): True to stop the windows at the first missing year of the country. Default is False.
+    drop_on_excluded (bool, optional): False to cut the windows at the first excluded year (or NaN value), True to drop
+        the windows containing one before they reach another crisis or the end of the country. Default is False.
+    arrays (dict, optional): The columns of the dataset from events.panel_arrays, built if not given.
+
+    Returns:
+    np.array: An (n_events, horizon+2) array with the row positions from ts-1 to ts+horizon of each event, clipped to the panel.
+    np.array: An (n_events, horizon+2) boolean mask of the rows that belong to the series of each event.
+    np.array: An (n_events,) boolean array, False for the events whose window is dropped.
+
+    The rows do not depend on the extracted column, so they can be shared by every column extracted with the same conditions.
+    Only the 'start', 'next_crisis', 'country_start' and 'country_end' columns of the events are used, so the windows of
+    other (e.g. simulated) crisis dates can be located the same way.
+    The year ts-1 is only valid if it belongs to the same country as ts, and after ts each window stops at the first of the
+    following conditions, applied as cumulative masks: the end of the country, the first year of another crisis, an excluded year,
+    a NaN value of nan_column and a missing year.
+    '''
+    if events is None:
+        events = crisis_events(data)
+    if arrays is None:
+        arrays = panel_arrays(data)
+
+    start = events['start'].to_numpy()
+    country_start = events['country_start'].to_numpy()[:, None]
+    country_end = events['country_end'].to_numpy()[:, None]
+
+    # Row positions of every window, from ts-1 to ts+horizon
+    offsets = np.arange(-1, horizon + 1)
+    positions = start[:, None] + offsets
+    in_country = (positions >= country_start) & (positions < country_end)
+    rows = np.clip(positions, 0, max(len(data) - 1, 0))
+
+    # Conditions ending a window after ts: the next crisis of the country, or the end of the country if there is none
+    after = offsets > 0
+    breaks = after & (positions >= events['next_crisis'].to_numpy()[:, None])
+
+    # Conditions contaminating a window after ts: excluded years and NaN values
+    excluded = after & in_country & arrays['excluded_years'][rows]
+    if nan_column is not None:
+        excluded |= after & in_country & np.isnan(column_array(data, arrays, nan_column)[rows])
+
+    # Missing years cut the window without ending it
+    gaps = np.zeros(positions.shape, dtype=bool)
+    if check_years:
+        gaps = after & in_country & (arrays['Year'][rows] != arrays['Year'][start][:, None] + offsets)
+
+    before_break = ~np.logical_or.accumulate(breaks, axis=1)
+    if drop_on_excluded:
+        kept = ~(excluded & before_break).any(axis=1)
+        valid = before_break & ~np.logical_or.accumulate(gaps, axis=1)
+    else:
+        kept = np.ones(len(start), dtype=bool)
+        valid = ~np.logical_or.accumulate(breaks | excluded | gaps, axis=1)
+
+    # The year ts-1 only exists if ts is not the first row of the country
+    valid[:, 0] = in_country[:, 0]
+
+    return rows, valid, kept
+
+def windows_to_series(windows, valid, kept, events=None, ragged=False):
+    '''
+    Convert extracted windows to a list of series.
+
+    Args:
+    windows (np.array): The values of the windows, from extract_windows.
+    valid (np.array): The mask of the values that belong to the series, from extract_windows.
+    kept (np.array): False for the windows to leave out, from extract_windows.
+    events (DataFrame, optional): The crisis event index the windows were extracted from. Default is None.
+    ragged (bool, optional): True to return a RaggedSeries, with the events of the kept windows. Default is False.
+
+    Returns:
+    list: A list of lists, where each sublist holds the valid values of a kept window.
+    '''
+    if ragged:
+        return RaggedSeries.from_windows(windows, valid, kept, events)
+    return [window[mask].tolist() for window, mask in zip(windows[kept], valid[kept])]
@@ -0,0 +1,92 @@
+'''
+Synthetic panels and series shared by the tests.
+'''
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+
+import dataset
+from synthetic import synthetic_datasets
+
+def panel(how, seed, n_countries=12, n_years=150):
+    '''
+    Build a synthetic panel as in the notebooks.
+
+    Args:
+    how (str): The merge of concat_dataset, 'left' (inflation) or 'inner' (output gap).
+    seed (int): The seed of the synthetic datasets.
+    n_countries (int, optional): The number of countries. Default is 12.
+    n_years (int, optional): The largest number of years of a country. Default is 150.
+
+    Returns:
+    DataFrame: The panel created by concat_dataset and dummy_variable.
+    '''
+    main_data, GDP_pc = synthetic_datasets(n_countries, n_years, seed=seed)
+    data = dataset.concat_dataset(main_data, GDP_pc, list(main_data['CC3'].unique()), how)
+    dataset.dummy_variable(data)
+    return data
+
+def by_country(function, data, *args):
+    '''
+    Run a reference loop on each country separately, as the vectorized extraction never carries a crisis to the next country.
+
+    Args:
+    function (function): The reference loop.
+    data (DataFrame): The panel.
+    *args: The other arguments of the loop.
+
+    Returns:
+    list: The outputs of all the countries, one after the other.
+    '''
+    output = []
+    for country in pd.unique(data['CC3']):
+        output.extend(function(data[data['CC3'] == country].reset_index(drop=True), *args))
+    return output
+
+def write_raw_datasets(directory, n_countries=6, n_years=100, seed=0):
+    '''
+    Write synthetic datasets in the format of the raw csv files.
+
+    Args:
+    directory (str): The directory of the files.
+    n_countries (int, optional): The number of countries. Default is 6.
+    n_years (int, optional): The largest number of years of a country. Default is 100.
+    seed (int, optional): The seed of the synthetic datasets. Default is 0.
+
+    Returns:
+    str: The path of the crises file, with its header row describing the columns.
+    str: The path of the GDP per capita file, with its annotations column.
+    '''
+    main_data, GDP_pc = synthetic_datasets(n_countries, n_years, seed=seed)
+    main_data = main_data.rename(columns={'banking_crisis':'Banking Crisis ',
+                                          'systemic_crisis':'Systemic Crisis',
+                                          'notes':'Banking_Crisis_Notes',
+                                          'currency_crisis':'Currency Crises',
+                                          'inflation_crisis':'Inflation Crises',
+                                          'gold_standard':'Gold Standard',
+                                          'annual_inflation':'Inflation, Annual percentages of average consumer prices'})
+    description = pd.DataFrame([['description'] * main_data.shape[1]], columns=main_data.columns)
+    crises_path = os.path.join(directory, 'crises.csv')
+    pd.concat([description, main_data]).to_csv(crises_path, index=False)
+
+    GDP_pc = GDP_pc.rename(columns={'GDP_per_capita':'GDP per capita'}).assign(**{'417485-annotations':None})
+    maddison_path = os.path.join(directory, 'maddison.csv')
+    GDP_pc.to_csv(maddison_path, index=False)
+    return crises_path, maddison_path
+
+def random_lists(seed=0, n_series=40):
+    '''
+    Draw series of random lengths, some of them empty.
+
+    Args:
+    seed (int, optional): The seed of the random draws. Default is 0.
+    n_series (int, optional): The number of series. Default is 40.
+
+    Returns:
+    list: The series, as a list of lists.
+    '''
+    rng = np.random.default_rng(seed)
+    return [rng.normal(0, 10, length).round(3).tolist() for length in rng.integers(0, 10, n_series)]
@@ -0,0 +1,44 @@
+'''
+Smoke tests of the benchmark scripts. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+
+CODE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code')
+sys.path.insert(0, CODE)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import benchmark
+import benchmark_imports
+
+class ImportsTest(unittest.TestCase):
+
+    def test_data_modules_do_not_import_heavy_packages(self):
+        # Every measured module leaves the plotting libraries and statsmodels to the figure runs
+        results = benchmark_imports.benchmark_imports(repeats=1, directory=CODE)
+        self.assertEqual(list(results['module']), ['python'] + benchmark_imports.MODULES)
+        self.assertEqual(results.set_index('module')['heavy'].to_dict(), {module: '' for module in results['module']})
+        self.assertTrue((results['seconds'] >= 0).all())
+
+    def test_heavy_packages_are_detected(self):
+        seconds, rss_mb, heavy = benchmark_imports.measure_import('seaborn', CODE)
+        self.assertGreater(seconds, 0)
+        self.assertGreater(rss_mb, 0)
+        self.assertIn('matplotlib', heavy)
+        self.assertIn('seaborn', heavy)
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_benchmark_size(self):
+        results = benchmark.benchmark_size(5, 60, repeats=1)
+        self.assertEqual(list(results.columns), ['countries', 'years', 'rows', 'stage', 'method', 'seconds', 'peak_mb'])
+        self.assertEqual(set(results['method']), {'-', 1, 2})
+        self.assertEqual(len(results[results['method'] == 1]), len(results[results['method'] == 2]))
+        self.assertTrue((results['seconds'] >= 0).all() and (results['peak_mb'] >= 0).all())
+        self.assertTrue((results[['countries', 'years']] == (5, 60)).all().all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+'''
+Tests of the bootstrap bands of the average patterns. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bootstrap import bootstrap_by_crisis_length, bootstrap_pattern
+from panels import random_lists
+from series import RaggedSeries
+from visualisation import compute_pattern
+
+class BootstrapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lists = [sublist for sublist in random_lists(2, n_series=50) if sublist]
+        self.clusters = [f'C{i % 7}' for i in range(len(self.lists))]
+
+    def test_pattern_and_bands(self):
+        bands = bootstrap_pattern(self.lists, replicates=500)
+        pattern, counts = compute_pattern(self.lists)
+        np.testing.assert_array_equal(bands['pattern'], pattern)
+        self.assertEqual(list(bands['count']), counts)
+        self.assertTrue((bands['lower'] <= bands['pattern']).all() and (bands['pattern'] <= bands['upper']).all())
+        self.assertTrue((bands['lower'] < bands['upper']).all())
+
+    def test_reproducible_whatever_the_number_of_processes(self):
+        expected = bootstrap_pattern(self.lists, replicates=300, clusters=self.clusters, seed=4, batch_size=70)
+        for processes in (1, 3):
+            actual = bootstrap_pattern(self.lists, replicates=300, clusters=self.clusters, seed=4, batch_size=70, processes=processes)
+            pd.testing.assert_frame_equal(actual, expected)
+        other = bootstrap_pattern(self.lists, replicates=300, clusters=self.clusters, seed=5, batch_size=70)
+        self.assertFalse(other['lower'].equals(expected['lower']))
+
+    def test_single_cluster(self):
+        # Every replicate draws the only cluster, so the bands are the pattern itself
+        bands = bootstrap_pattern(self.lists, replicates=50, clusters=['C0'] * len(self.lists))
+        np.testing.assert_allclose(bands['lower'], bands['pattern'])
+        np.testing.assert_allclose(bands['upper'], bands['pattern'])
+
+    def test_nan_values_are_left_out(self):
+        lists = [[1.0, 2.0, np.nan], [3.0, np.nan, 5.0], [2.0, 4.0, 6.0]]
+        bands = bootstrap_pattern(lists, replicates=200)
+        self.assertTrue(np.isnan(bands['pattern'][1:]).all())
+        self.assertTrue(np.isfinite(bands[['lower', 'upper']].to_numpy()).all())
+        self.assertTrue((bands['lower'] >= [1, 2, 5]).all() and (bands['upper'] <= [3, 4, 6]).all())
+
+    def test_by_crisis_length(self):
+        series = RaggedSeries.from_lists(self.lists, pd.DataFrame({'CC3': self.clusters}))
+        durations = [i % 3 + 1 for i in range(len(self.lists))]
+        bands = bootstrap_by_crisis_length(series, durations, replicates=100, clusters='CC3')
+        self.assertEqual(sorted(bands), [1, 2, 3])
+        for length, band in bands.items():
+            selected = series.by_duration(durations, length)
+            pd.testing.assert_frame_equal(band, bootstrap_pattern(selected, replicates=100, clusters='CC3'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+'''
+Tests of the columnar disk cache. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import tempfile
+import time
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cache
+
+def example_frame():
+    '''
+    Build a dataframe with a column of each kind stored by save_frame.
+
+    Returns:
+    DataFrame: The dataframe, with a non-default index.
+    '''
+    return pd.DataFrame({
+        'float': [1.5, np.nan, -2.0, 0.25],
+        'int': np.array([1, 2, 3, 4], dtype='int64'),
+        'bool': [True, False, True, False],
+        'nullable_int': pd.array([1, None, 3, 4], dtype='Int64'),
+        'nullable_bool': pd.array([True, None, False, True], dtype='boolean'),
+        'categorical': pd.Categorical(['b', 'a', None, 'b'], categories=['b', 'a'], ordered=True),
+        'text': np.array(['USA', np.nan, 'FRA', 'USA'], dtype=object),
+        'date': pd.to_datetime(['2000-01-01', '2001-01-01', '2002-01-01', '2003-01-01']),
+        'mixed': np.array([1, 'x', None, 2.5], dtype=object),
+    }, index=pd.Index([10, 11, 12, 13], name='row'))
+
+def bases(array):
+    '''
+    List the arrays whose memory an array views.
+
+    Args:
+    array (np.array): The array.
+
+    Returns:
+    list: Its base, the base of its base, and so on.
+    '''
+    found = []
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+        found.append(array)
+    return found
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_round_trip(self):
+        df = example_frame()
+        path = os.path.join(self.directory.name, 'frame')
+        cache.save_frame(df, path)
+        for mmap in (True, False):
+            with self.subTest(mmap=mmap):
+                loaded = cache.load_frame(path, mmap=mmap)
+                pd.testing.assert_frame_equal(loaded, df, check_index_type=False, check_names=False)
+                # The objects which are not strings are not turned into strings
+                self.assertEqual(list(loaded['mixed']), [1, 'x', None, 2.5])
+
+    def test_empty_frames(self):
+        for df in (pd.DataFrame(index=pd.RangeIndex(3)), example_frame().iloc[:0].reset_index(drop=True)):
+            path = os.path.join(self.directory.name, 'frame')
+            cache.save_frame(df, path)
+            pd.testing.assert_frame_equal(cache.load_frame(path), df, check_index_type=False, check_column_type=False)
+
+    def test_memory_mapped_columns_are_not_copied(self):
+        df = pd.DataFrame({'a': np.arange(1000.0), 'b': np.arange(1000.0) * 2, 'c': np.arange(1000)})
+        path = os.path.join(self.directory.name, 'frame')
+        cache.save_frame(df, path)
+
+        loaded = cache.load_frame(path)
+        for name in df.columns:
+            values = loaded[name].to_numpy()
+            mapped = [base for base in bases(values) if isinstance(base, np.memmap)]
+            self.assertTrue(mapped and np.shares_memory(values, mapped[0]), name)
+            np.testing.assert_array_equal(values, df[name].to_numpy())
+
+        # Copy-on-write: modifying the loaded frame leaves the cache unchanged
+        loaded.loc[0, 'a'] = -1.0
+        self.assertEqual(cache.load_frame(path).loc[0, 'a'], 0.0)
+
+    def test_cached_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return example_frame()
+
+        for _ in range(2):
+            df = cache.cached('stage', 'key', compute, self.directory.name)
+        self.assertEqual(len(calls), 1)
+        pd.testing.assert_frame_equal(df, example_frame(), check_index_type=False, check_names=False)
+
+    def test_evict_least_recently_used(self):
+        df = pd.DataFrame({'a': np.arange(10000.0)})
+        for i, name in enumerate(['first', 'second', 'third']):
+            path = os.path.join(self.directory.name, name)
+            cache.save_frame(df, path)
+            # Distinct access times, the first entry being used last
+            os.utime(os.path.join(path, 'meta.json'), (time.time() + [10, 1, 2][i],) * 2)
+
+        size = sum(entry.stat().st_size for entry in os.scandir(os.path.join(self.directory.name, 'first')))
+        cache.evict(self.directory.name, max_bytes=2 * size, keep=None)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['first', 'third'])
+
+        # The kept entry survives even when the cache stays too large
+        cache.evict(self.directory.name, max_bytes=0, keep=os.path.join(self.directory.name, 'third'))
+        self.assertEqual(os.listdir(self.directory.name), ['third'])
+
+if __name__ == '__main__':
+    unittest.main()
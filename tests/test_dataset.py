@@ -0,0 +1,94 @@
+'''
+Tests of the construction of the country panels. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dataset
+import extraction_method_1
+import extraction_method_2
+from panels import panel
+from synthetic import synthetic_datasets
+
+def concat_by_country(dataset1, dataset2, list, how, smoothing_param=6.25):
+    '''
+    The loop of concat_dataset before the single merge: one filter and one merge per country.
+    '''
+    all_datasets = []
+    for code in list:
+        df = dataset.merge_datasets(dataset1[dataset1['CC3'] == code],
+                                    dataset.create_output_df(dataset2, code, smoothing_param), how = how)
+        all_datasets.append(df)
+    return pd.concat(all_datasets, ignore_index=True)
+
+class ConcatDatasetTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.main_data, cls.GDP_pc = synthetic_datasets(10, 150, seed=2)
+        codes = list(cls.main_data['CC3'].unique())
+        # Out of order, with a repeated country (kept once) and a country without data
+        cls.countries = codes[5:] + codes[:5] + [codes[0], 'XXX']
+
+    def test_same_as_the_loop_by_country(self):
+        for how in ('left', 'inner'):
+            for smoothing_param in (6.25, 100):
+                with self.subTest(how=how, smoothing_param=smoothing_param):
+                    expected = concat_by_country(self.main_data, self.GDP_pc, list(dict.fromkeys(self.countries)), how, smoothing_param)
+                    actual = dataset.concat_dataset(self.main_data, self.GDP_pc, self.countries, how, smoothing_param)
+                    pd.testing.assert_frame_equal(actual, expected)
+
+    def test_output_panel_same_as_by_country(self):
+        expected = pd.concat([dataset.create_output_df(self.GDP_pc, code) for code in self.GDP_pc['Code'].unique()])
+        pd.testing.assert_frame_equal(dataset.create_output_panel(self.GDP_pc), expected)
+
+    def test_sweep_columns(self):
+        smoothing_params = [6.25, 100, 1600]
+        sweep = dataset.concat_dataset_sweep(self.main_data, self.GDP_pc, self.countries, 'inner', smoothing_params)
+        self.assertEqual([column for column in sweep.columns if column.startswith('output_gap')],
+                         ['output_gap_6.25', 'output_gap_100', 'output_gap_1600'])
+        for smoothing_param in smoothing_params:
+            single = dataset.concat_dataset(self.main_data, self.GDP_pc, self.countries, 'inner', smoothing_param)
+            np.testing.assert_array_equal(sweep[dataset.output_gap_column(smoothing_param)], single['output_gap'],
+                                          err_msg=str(smoothing_param))
+            pd.testing.assert_frame_equal(sweep.drop(columns=[c for c in sweep.columns if c.startswith('output_gap')]),
+                                          single.drop(columns='output_gap'))
+
+class CompactPanelTest(unittest.TestCase):
+
+    def test_schema(self):
+        data = panel('left', 0)
+        data['output_gap_100'] = data['output_gap']
+        compact = dataset.compact_panel(data)
+        self.assertEqual(list(compact.columns), list(dataset.COMPACT_PANEL_SCHEMA) + ['output_gap_100'])
+        self.assertEqual(str(compact['output_gap_100'].dtype), 'float32')
+        self.assertEqual(len(compact), len(data))
+        self.assertLess(compact.memory_usage(deep=True).sum(), data.memory_usage(deep=True).sum() / 4)
+
+    def test_same_extraction_as_the_full_panel(self):
+        # The same crises and series, up to the precision of float32
+        for how in ('left', 'inner'):
+            data = panel(how, 1)
+            compact = dataset.compact_panel(data)
+            for module in (extraction_method_1, extraction_method_2):
+                message = f'{module.__name__} on the {how} panel'
+                self.assertEqual(list(module.compute_crisis_duration(data)), list(module.compute_crisis_duration(compact)), message)
+                for function, args in (('extract_inflation_series', ()), ('extract_output_gap_series', ()),
+                                       ('inflation_dynamics', (True,)), ('output_gap_dynamics', (False,))):
+                    expected = getattr(module, function)(data, *args)
+                    actual = getattr(module, function)(compact, *args)
+                    self.assertEqual([len(serie) for serie in expected], [len(serie) for serie in actual], f'{function} {message}')
+                    for x, y in zip(expected, actual):
+                        np.testing.assert_allclose(np.array(y, dtype=float), np.array(x, dtype=float), atol=1e-5,
+                                                   err_msg=f'{function} {message}')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+Compare the vectorized extraction with the row-by-row loops it replaced, on synthetic panels. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import extraction_method_1
+import extraction_method_2
+import reference_method_1
+import reference_method_2
+from panels import by_country, panel
+from series import round_like_builtin
+
+METHODS = [(extraction_method_1, reference_method_1), (extraction_method_2, reference_method_2)]
+
+class ExtractionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.panels = [(how, seed, panel(how, seed)) for seed in range(4) for how in ('left', 'inner')]
+
+    def assertSameSeries(self, expected, actual, message):
+        expected = [list(map(float, serie)) for serie in expected]
+        actual = [list(map(float, serie)) for serie in actual]
+        self.assertEqual(len(expected), len(actual), message)
+        for i, (x, y) in enumerate(zip(expected, actual)):
+            np.testing.assert_array_equal(x, y, err_msg=f'{message}, serie {i}')
+
+    def test_left_panel_has_nan_output_gap_at_first_crisis_year(self):
+        # The case of a crisis that is skipped by the recovery dynamics of the output gap
+        data = self.panels[0][2]
+        first_years = data['banking_crisis_only_first_year'] == 1
+        self.assertTrue((first_years & data['output_gap'].isna() & data['annual_inflation'].notna()).any())
+
+    def test_crisis_duration(self):
+        for how, seed, data in self.panels:
+            for module, reference in METHODS:
+                with self.subTest(how=how, seed=seed, method=module.__name__):
+                    self.assertEqual(by_country(reference.compute_crisis_duration, data),
+                                     list(module.compute_crisis_duration(data)))
+
+    def test_extract_series(self):
+        for how, seed, data in self.panels:
+            for module, reference in METHODS:
+                for function in ('extract_inflation_series', 'extract_output_gap_series'):
+                    message = f'{function} of {module.__name__} on the {how} panel {seed}'
+                    self.assertSameSeries(by_country(getattr(reference, function), data),
+                                          getattr(module, function)(data), message)
+
+    def test_normalize_serie(self):
+        # The RaggedSeries are normalized on their flat buffer, with the rounding of the built-in round of the lists
+        for how, seed, data in self.panels:
+            for module, reference in METHODS:
+                series = by_country(reference.extract_inflation_series, data)
+                message = f'normalize_serie of {module.__name__} on the {how} panel {seed}'
+                self.assertSameSeries(reference.normalize_serie(series),
+                                      module.normalize_serie(module.extract_inflation_series(data, ragged=True)), message)
+
+    def test_round_like_builtin(self):
+        values = np.concatenate(([2.675, -2.675, 1.005, 0.125, 0.375, np.nan, np.inf, 1e17],
+                                 np.random.default_rng(0).normal(0, 20, 100000).round(3)))
+        expected = np.array([round(value, 2) for value in values.tolist()])
+        np.testing.assert_array_equal(round_like_builtin(values, 2), expected)
+
+    def test_dynamics(self):
+        for how, seed, data in self.panels:
+            for module, reference in METHODS:
+                for function in ('inflation_dynamics', 'output_gap_dynamics'):
+                    for during_crisis in (True, False):
+                        message = f'{function}(during_crisis={during_crisis}) of {module.__name__} on the {how} panel {seed}'
+                        self.assertSameSeries(by_country(getattr(reference, function), data, during_crisis),
+                                              getattr(module, function)(data, during_crisis), message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+'''
+Compare the two-way fixed-effects estimator with statsmodels regressions on country and year dummies. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixed_effects import crisis_phase_effects
+from panels import panel
+
+try:
+    import statsmodels.api as sm
+except ImportError:
+    sm = None
+
+def regression_with_dummies(data, column, regressors):
+    '''
+    Regress a column on regressors with country and year dummies, clustering by country.
+
+    Returns:
+    Series: The coefficients of the regressors.
+    Series: Their standard errors, with the small-sample correction of the within estimator.
+    int: The number of observations.
+    '''
+    sample = data[[column] + regressors].notna().all(axis=1)
+    data = data[sample]
+    X = pd.concat([data[regressors].astype(float),
+                   pd.get_dummies(data['CC3'], dtype=float),
+                   pd.get_dummies(data['Year'], dtype=float, drop_first=True)], axis=1)
+    fit = sm.OLS(data[column].to_numpy(), X).fit(cov_type='cluster', cov_kwds={'groups': pd.factorize(data['CC3'])[0]})
+
+    # statsmodels counts the country dummies in the correction, the within estimator does not as they are nested in the clusters
+    n, k = X.shape
+    within_k = len(regressors) + data['Year'].nunique() - 1
+    std_errors = fit.bse[regressors] * np.sqrt((n - k) / (n - within_k))
+    return fit.params[regressors], std_errors, n
+
+@unittest.skipIf(sm is None, 'statsmodels is not installed (see requirements-dev.txt)')
+class FixedEffectsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = panel('inner', 1, n_countries=8, n_years=100)
+
+    def test_same_as_regression_with_dummies(self):
+        results = crisis_phase_effects(self.data)
+        # The phases sum to one where inflation is known, so the last one is omitted for inflation but not for the output gap
+        for column, kept in (('annual_inflation', ['banking_crisis_only', 'recovery_only']),
+                             ('output_gap', ['banking_crisis_only', 'recovery_only', 'excluded_years'])):
+            rows = results[results['variable'] == column].set_index('regressor')
+            self.assertEqual(list(rows.index[rows['coefficient'].notna()]), kept)
+            coefficients, std_errors, observations = regression_with_dummies(self.data, column, kept)
+            self.assertEqual(rows['observations'].iloc[0], observations)
+            np.testing.assert_allclose(rows.loc[kept, 'coefficient'], coefficients, rtol=1e-6, err_msg=column)
+            np.testing.assert_allclose(rows.loc[kept, 'std_error'], std_errors, rtol=1e-6, err_msg=column)
+
+    def test_single_cluster(self):
+        data = self.data.assign(cluster='all')
+        results = crisis_phase_effects(data, columns=('output_gap',), cluster='cluster')
+        expected = crisis_phase_effects(self.data, columns=('output_gap',))
+        np.testing.assert_allclose(results['coefficient'], expected['coefficient'])
+        self.assertTrue(results['std_error'].isna().all())
+
+if __name__ == '__main__':
+    unittest.main()
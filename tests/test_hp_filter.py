@@ -0,0 +1,79 @@
+'''
+Compare the banded Hodrick-Prescott filter with statsmodels' hpfilter. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hp_filter import hp_trend, hp_trend_groups, hp_trend_sweep
+
+try:
+    from statsmodels.tsa.filters.hp_filter import hpfilter
+except ImportError:
+    hpfilter = None
+
+def random_panel(seed=0, lengths=(3, 30, 30, 57, 120)):
+    '''
+    Draw GDP-like series of several lengths, with the rows of the countries interleaved.
+
+    Args:
+    seed (int, optional): The seed of the random draws. Default is 0.
+    lengths (tuple, optional): The length of the series of each country. Default is (3, 30, 30, 57, 120).
+
+    Returns:
+    np.array: The values of the panel.
+    np.array: The country of each value.
+    '''
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([1000 * np.exp(np.cumsum(rng.normal(0.02, 0.04, length))) for length in lengths])
+    groups = np.repeat([f'C{i}' for i in range(len(lengths))], lengths)
+
+    # Interleave the rows of the countries, keeping the order of the years inside each country
+    shuffled = groups[rng.permutation(len(groups))]
+    positions = np.argsort(pd.factorize(shuffled, sort=True)[0], kind='stable')
+    interleaved = np.empty_like(values)
+    interleaved[positions] = values
+    return interleaved, shuffled
+
+@unittest.skipIf(hpfilter is None, 'statsmodels is not installed (see requirements-dev.txt)')
+class HPFilterTest(unittest.TestCase):
+
+    def assertSameTrend(self, values, groups, trend, lamb):
+        for group in np.unique(groups):
+            rows = groups == group
+            np.testing.assert_allclose(trend[rows], hpfilter(values[rows], lamb=lamb)[1], rtol=1e-9, err_msg=group)
+
+    def test_single_series(self):
+        values, _ = random_panel(lengths=(80,))
+        for lamb in (6.25, 100, 1600):
+            np.testing.assert_allclose(hp_trend(values, lamb), hpfilter(values, lamb=lamb)[1], rtol=1e-9)
+
+    def test_groups_and_sweep(self):
+        values, groups = random_panel()
+        lambs = [6.25, 100, 1600]
+        trends = hp_trend_sweep(values, groups, lambs)
+        for j, lamb in enumerate(lambs):
+            self.assertSameTrend(values, groups, trends[:, j], lamb)
+            np.testing.assert_array_equal(hp_trend_groups(values, groups, lamb), trends[:, j])
+
+    def test_nan_only_affects_its_country(self):
+        values, groups = random_panel(1)
+        # A missing value in one of the two countries of length 30
+        values[np.flatnonzero(groups == 'C1')[7]] = np.nan
+        trend = hp_trend_groups(values, groups, 6.25)
+
+        self.assertTrue(np.isnan(trend[groups == 'C1']).all())
+        self.assertTrue(np.isnan(hpfilter(values[groups == 'C1'], lamb=6.25)[1]).all())
+        finite = groups != 'C1'
+        self.assertFalse(np.isnan(trend[finite]).any())
+        self.assertSameTrend(values[finite], groups[finite], trend[finite], 6.25)
+
+if __name__ == '__main__':
+    unittest.main()
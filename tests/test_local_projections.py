@@ -0,0 +1,91 @@
+'''
+Compare the batched local projections with statsmodels regressions on country dummies. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_projections import local_projections
+from panels import panel
+
+try:
+    import statsmodels.api as sm
+except ImportError:
+    sm = None
+
+def shifted(data, column, h):
+    '''
+    Get the value of a column h years later in the same country, only when the years in between follow each other.
+    '''
+    countries = data.groupby('CC3', sort=False)
+    consecutive = countries['Year'].shift(-h) - data['Year'] == h
+    return countries[column].shift(-h).where(consecutive).to_numpy()
+
+def projection_with_dummies(data, column, h, lags=2):
+    '''
+    Regress y(t+h) on the shock and the lags of y with country dummies, clustering by country.
+
+    Returns:
+    float: The coefficient of the shock.
+    float: Its standard error, with the small-sample correction of the within estimator.
+    int: The number of observations.
+    '''
+    regressors = pd.DataFrame({'shock': data['banking_crisis_only_first_year'].astype(float)})
+    for lag in range(1, lags + 1):
+        regressors[f'lag{lag}'] = shifted(data, column, -lag)
+    dummies = pd.get_dummies(data['CC3'], dtype=float)
+    y = shifted(data, column, h)
+    sample = ~np.isnan(y) & regressors.notna().all(axis=1).to_numpy()
+
+    X = pd.concat([regressors, dummies], axis=1)[sample]
+    X = X.loc[:, X.any()]
+    fit = sm.OLS(y[sample], X).fit(cov_type='cluster', cov_kwds={'groups': pd.factorize(data['CC3'][sample])[0]})
+
+    # statsmodels counts the dummies in the number of regressors of the correction, the within estimator does not
+    n, k = X.shape
+    within_k = regressors.shape[1]
+    std_error = fit.bse['shock'] * np.sqrt((n - k) / (n - within_k))
+    return fit.params['shock'], std_error, n
+
+@unittest.skipIf(sm is None, 'statsmodels is not installed (see requirements-dev.txt)')
+class LocalProjectionsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # The inner panel has gaps of years, which break the leads and lags
+        cls.data = panel('inner', 0, n_countries=8, n_years=120)
+
+    def test_same_as_regressions_with_dummies(self):
+        results = local_projections(self.data, horizons=4)
+        for column in ('annual_inflation', 'output_gap'):
+            for h in range(5):
+                row = results[(results['variable'] == column) & (results['horizon'] == h)].iloc[0]
+                coefficient, std_error, observations = projection_with_dummies(self.data, column, h)
+                message = f'{column} at horizon {h}'
+                self.assertEqual(row['observations'], observations, message)
+                np.testing.assert_allclose(row['coefficient'], coefficient, rtol=1e-8, err_msg=message)
+                np.testing.assert_allclose(row['std_error'], std_error, rtol=1e-8, err_msg=message)
+
+    def test_horizon_without_shock_is_nan(self):
+        data = self.data.assign(banking_crisis_only_first_year=0)
+        results = local_projections(data, columns=('annual_inflation',), horizons=2)
+        self.assertTrue(results['coefficient'].isna().all())
+        self.assertTrue(results['std_error'].isna().all())
+
+    def test_single_cluster(self):
+        data = self.data.assign(cluster='all')
+        results = local_projections(data, columns=('annual_inflation',), horizons=2, cluster='cluster')
+        expected = local_projections(self.data, columns=('annual_inflation',), horizons=2)
+        np.testing.assert_array_equal(results['coefficient'], expected['coefficient'])
+        self.assertTrue(results['std_error'].isna().all())
+        self.assertEqual(set(results['clusters']), {1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+'''
+Compare the statistics of the average patterns with loops over the positions. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from panels import random_lists
+from patterns import pattern_statistics
+from series import RaggedSeries
+from visualisation import compute_pattern
+
+def compute_pattern_loop(list):
+    '''
+    The loop of compute_pattern before it was vectorized.
+    '''
+    nb_data_points = []
+    max_length = max(len(sublist) for sublist in list)
+    pattern = np.zeros(max_length)
+    for i in range(max_length):
+        col_sum = 0
+        length = 0
+        for sublist in list:
+            if i < len(sublist):
+                col_sum += sublist[i]
+                length += 1
+        pattern[i] = col_sum / length if length > 0 else 0
+        nb_data_points.append(length)
+    return pattern, nb_data_points
+
+def position_values(lists, i):
+    return np.array([sublist[i] for sublist in lists if i < len(sublist)])
+
+class PatternTest(unittest.TestCase):
+
+    def test_compute_pattern_same_as_the_loop(self):
+        for seed in range(5):
+            lists = random_lists(seed)
+            for series in (lists, RaggedSeries.from_lists(lists)):
+                pattern, counts = compute_pattern(series)
+                expected_pattern, expected_counts = compute_pattern_loop(lists)
+                np.testing.assert_array_equal(pattern, expected_pattern, err_msg=str(seed))
+                self.assertEqual(counts, expected_counts)
+
+    def test_statistics_by_position(self):
+        lists = random_lists(1, n_series=60)
+        statistics = pattern_statistics(lists, quantiles=(0.05, 0.9))
+        self.assertEqual(list(statistics.columns), ['mean', 'count', 'std', 'sem', 'median', 'q0.05', 'q0.9'])
+        for i, row in statistics.iterrows():
+            values = position_values(lists, i)
+            self.assertEqual(row['count'], len(values))
+            np.testing.assert_allclose(row['mean'], values.mean())
+            if len(values) > 1:
+                np.testing.assert_allclose(row['std'], values.std(ddof=1))
+                np.testing.assert_allclose(row['sem'], values.std(ddof=1) / np.sqrt(len(values)))
+            else:
+                self.assertTrue(np.isnan(row['std']))
+            for column, q in (('median', 0.5), ('q0.05', 0.05), ('q0.9', 0.9)):
+                np.testing.assert_allclose(row[column], np.quantile(values, q), err_msg=f'{column} at {i}')
+
+    def test_quantiles_ignore_nan(self):
+        lists = [[1.0, np.nan, 3.0], [2.0, np.nan], [np.nan, 5.0, 4.0, 7.0], [4.0, 6.0]]
+        statistics = pattern_statistics(lists, quantiles=(0.25,))
+        for i, row in statistics.iterrows():
+            values = position_values(lists, i)
+            self.assertEqual(row['count'], len(values))
+            for column, q in (('median', 0.5), ('q0.25', 0.25)):
+                np.testing.assert_allclose(row[column], np.nanquantile(values, q), err_msg=f'{column} at {i}')
+
+if __name__ == '__main__':
+    unittest.main()
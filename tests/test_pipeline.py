@@ -0,0 +1,103 @@
+'''
+Tests of the memoization of the pipeline stages. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pipeline
+from pipeline import Pipeline, Stage
+from synthetic import synthetic_datasets
+
+CALLS = []
+
+def synthetic_crises(seed):
+    CALLS.append('crises')
+    return synthetic_datasets(8, 120, seed=seed)[0]
+
+def synthetic_maddison(seed):
+    CALLS.append('maddison')
+    return synthetic_datasets(8, 120, seed=seed)[1]
+
+def pattern_length(pattern):
+    CALLS.append('length')
+    return len(pattern)
+
+def pattern_sum(pattern):
+    CALLS.append('sum')
+    return float(pattern['pattern'].sum())
+
+# The default stages, reading synthetic datasets instead of the csv files
+STAGES = [Stage('crises', synthetic_crises, params=('seed',)), Stage('maddison', synthetic_maddison, params=('seed',))] + \
+         [stage for stage in pipeline.STAGES if stage.name not in ('crises', 'maddison')]
+
+PARAMETERS = {'seed': 0, 'countries': [f'C{i}' for i in range(8)]}
+
+def statuses(report):
+    return dict(zip(report['stage'], report['status']))
+
+class PipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_memory_hits_and_misses(self):
+        runner = Pipeline(STAGES)
+        first, report = runner.run(['pattern'], **PARAMETERS)
+        self.assertEqual(set(report['status']), {'computed'})
+
+        second, report = runner.run(['pattern'], **PARAMETERS)
+        self.assertEqual(statuses(report), {'pattern': 'memory'})
+        self.assertIs(first['pattern'], second['pattern'])
+
+        # Only the stages using the horizon and the stages after them are computed again
+        _, report = runner.run(['pattern'], horizon=6, **PARAMETERS)
+        self.assertEqual(statuses(report), {'panel': 'memory', 'events': 'memory', 'series': 'computed',
+                                            'normalized': 'computed', 'durations': 'memory', 'pattern': 'computed'})
+        self.assertEqual(CALLS, ['crises', 'maddison'])
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            expected, _ = Pipeline(STAGES, cache_dir=directory).run(['pattern', 'frequency'], **PARAMETERS)
+            output, report = Pipeline(STAGES, cache_dir=directory).run(['pattern', 'frequency'], **PARAMETERS)
+            self.assertEqual(statuses(report), {'pattern': 'disk', 'frequency': 'disk'})
+            self.assertTrue(output['pattern'].equals(expected['pattern']))
+            self.assertTrue(output['frequency'].equals(expected['frequency']))
+
+    def test_replaced_function_invalidates_the_stage(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runner = Pipeline(STAGES, cache_dir=directory)
+            runner.add(Stage('summary', pattern_length, inputs=('pattern',)))
+            length, _ = runner.run(['summary'], **PARAMETERS)
+
+            runner.add(Stage('summary', pattern_sum, inputs=('pattern',)))
+            total, report = runner.run(['summary'], **PARAMETERS)
+            self.assertEqual(statuses(report), {'pattern': 'memory', 'summary': 'computed'})
+            self.assertEqual(CALLS.count('length'), 1)
+            self.assertEqual(CALLS.count('sum'), 1)
+            self.assertNotEqual(length['summary'], total['summary'])
+
+            # The disk cache keeps the output of each function apart
+            other = Pipeline(STAGES, cache_dir=directory)
+            other.add(Stage('summary', pattern_length, inputs=('pattern',)))
+            output, report = other.run(['summary'], **PARAMETERS)
+            self.assertEqual(statuses(report)['summary'], 'disk')
+            self.assertEqual(output['summary'], length['summary'])
+
+    def test_side_effect_stage_runs_at_each_run(self):
+        runner = Pipeline(STAGES)
+        runner.add(Stage('plot', pattern_length, inputs=('pattern',), memoize=False))
+        for _ in range(3):
+            _, report = runner.run(['plot'], **PARAMETERS)
+            self.assertEqual(statuses(report)['plot'], 'computed')
+        self.assertEqual(CALLS.count('length'), 3)
+        self.assertEqual(statuses(report)['pattern'], 'memory')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+'''
+Tests of the placebo permutation test. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import extraction_method_1
+from events import crisis_events
+from extraction import METHOD_1
+from panels import panel
+from placebo import placebo_test
+from visualisation import compute_pattern
+
+class PlaceboTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = panel('left', 0)
+
+        # No actual crisis reaches ts+8: the inflation of the 8th year after each first year is missing
+        cls.short = cls.data.copy()
+        events = crisis_events(cls.short)
+        inside = events['start'] + 8 < events['country_end']
+        cls.short.iloc[(events['start'] + 8)[inside], cls.short.columns.get_loc('annual_inflation')] = np.nan
+
+    def test_observed_is_compute_pattern(self):
+        result = placebo_test(self.data, 'annual_inflation', METHOD_1, draws=50)
+        pattern, counts = compute_pattern(extraction_method_1.normalize_serie(extraction_method_1.extract_inflation_series(self.data)))
+        expected = np.where(np.array(counts) > 0, pattern, np.nan)
+        np.testing.assert_allclose(result['observed'].to_numpy()[:len(expected)], expected, rtol=0, atol=1e-12)
+
+    def test_no_observed_data_point_has_no_p_value(self):
+        for mode in ('count', 'block'):
+            with self.subTest(mode=mode):
+                result = placebo_test(self.short, 'annual_inflation', METHOD_1, draws=100, mode=mode)
+                self.assertTrue(np.isnan(result.loc['ts+8', 'observed']))
+                self.assertTrue(np.isnan(result.loc['ts+8', 'p_value']))
+                # The placebo crises still reach ts+8, and the other positions are tested
+                self.assertFalse(np.isnan(result.loc['ts+8', 'placebo_mean']))
+                self.assertTrue(result['p_value'].drop('ts+8').between(0, 1).all())
+
+    def test_reproducible(self):
+        first = placebo_test(self.data, 'annual_inflation', METHOD_1, draws=60, seed=3, batch_size=25)
+        second = placebo_test(self.data, 'annual_inflation', METHOD_1, draws=60, seed=3, batch_size=25)
+        np.testing.assert_array_equal(first.to_numpy(), second.to_numpy())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+'''
+Compare the typed loader of the Global Crises dataset with the preprocessing of the notebooks. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import preprocess
+from panels import write_raw_datasets
+from pipeline import load_crises
+
+class LoaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path, _ = write_raw_datasets(self.directory.name, n_countries=8, n_years=120, seed=3)
+
+    def assertSameAsPreprocessed(self, path):
+        expected = load_crises(path)[list(preprocess.GLOBAL_CRISES_SCHEMA)].reset_index(drop=True)
+        loaded = preprocess.load_global_crises_data(path)
+        self.assertEqual(dict(loaded.dtypes.astype(str)), preprocess.GLOBAL_CRISES_SCHEMA)
+        pd.testing.assert_frame_equal(loaded, expected.astype(preprocess.GLOBAL_CRISES_SCHEMA))
+
+    def test_same_as_preprocessed(self):
+        self.assertSameAsPreprocessed(self.path)
+
+    def test_text_in_numeric_columns(self):
+        # Cells that are not numbers become missing values, as with pd.to_numeric(errors='coerce')
+        raw = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        raw.loc[[3, 10], 'Inflation, Annual percentages of average consumer prices'] = 'n/a'
+        raw.loc[5, 'Banking Crisis '] = '?'
+        raw.to_csv(self.path, index=False)
+
+        loaded = preprocess.load_global_crises_data(self.path)
+        self.assertTrue(loaded['annual_inflation'].iloc[[2, 9]].isna().all())
+        self.assertTrue(pd.isna(loaded['banking_crisis'].iloc[4]))
+        self.assertSameAsPreprocessed(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
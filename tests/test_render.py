@@ -0,0 +1,83 @@
+'''
+Tests of the headless batch renderer. From the repository root:
+
+    python -m unittest discover tests
+'''
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+import sweep
+from render import MANIFEST, render_figures
+from synthetic import synthetic_datasets
+
+def file_digests(directory):
+    '''
+    Hash the figures of a directory.
+
+    Args:
+    directory (str): The directory.
+
+    Returns:
+    dict: The MD5 digest of each figure file.
+    '''
+    digests = {}
+    for name in os.listdir(directory):
+        if name != MANIFEST:
+            with open(os.path.join(directory, name), 'rb') as file:
+                digests[name] = hashlib.md5(file.read()).hexdigest()
+    return digests
+
+class RenderTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        main_data, GDP_pc = synthetic_datasets(4, 80, seed=1)
+        countries = list(main_data['CC3'].unique())
+        _, cls.outputs = sweep.sweep(main_data, GDP_pc, {'A': countries}, methods=(1,))
+        _, cls.changed = sweep.sweep(main_data, GDP_pc, {'A': countries}, methods=(1,), horizon=6)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_renders_then_skips_unchanged_figures(self):
+        report = render_figures(self.outputs, self.directory.name, formats=('png', 'svg'))
+        self.assertEqual(set(report['status']), {'rendered'})
+        self.assertEqual(sorted(report['name']), sorted(file_digests(self.directory.name)))
+        self.assertIn('A_method1_annual_inflation_dynamics.svg', set(report['name']))
+
+        report = render_figures(self.outputs, self.directory.name, formats=('png', 'svg'))
+        self.assertEqual(set(report['status']), {'skipped'})
+
+        # Only the figures drawn from changed data are rendered again
+        report = render_figures(self.changed, self.directory.name, formats=('png', 'svg'))
+        statuses = dict(zip(report['name'], report['status']))
+        self.assertEqual(statuses['A_method1_annual_inflation_dynamics.png'], 'skipped')
+        self.assertIn('rendered', set(report['status']))
+
+    def test_deterministic_files(self):
+        render_figures(self.outputs, self.directory.name, formats=('png', 'svg'))
+        first = file_digests(self.directory.name)
+        render_figures(self.outputs, self.directory.name, formats=('png', 'svg'), processes=2, force=True)
+        self.assertEqual(file_digests(self.directory.name), first)
+
+    def test_caller_backend_unchanged(self):
+        backend = matplotlib.get_backend()
+        salt = matplotlib.rcParams['svg.hashsalt']
+        render_figures(self.outputs, self.directory.name, formats=('svg',))
+        self.assertEqual(matplotlib.get_backend(), backend)
+        self.assertEqual(matplotlib.rcParams['svg.hashsalt'], salt)
+
+    def test_processes_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            render_figures(self.outputs, self.directory.name, processes=0)
+
+if __name__ == '__main__':
+    unittest.main()
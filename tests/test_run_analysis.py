@@ -0,0 +1,86 @@
+'''
+Tests of the command-line interface. From the repository root:
+
+    python -m unittest discover tests
+'''
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import run_analysis
+import sweep
+from panels import write_raw_datasets
+from pipeline import load_crises, load_maddison
+
+COUNTRIES = [f'C{i}' for i in range(6)]
+
+def rejected(argv):
+    '''
+    Parse command-line arguments which should be rejected.
+
+    Args:
+    argv (list): The arguments.
+
+    Returns:
+    str: The error message printed by argparse, or None when the arguments were accepted.
+    '''
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        try:
+            run_analysis.parse_arguments(argv)
+        except SystemExit:
+            return stderr.getvalue()
+    return None
+
+class ArgumentsTest(unittest.TestCase):
+
+    def test_defaults(self):
+        arguments = run_analysis.parse_arguments([])
+        self.assertEqual(arguments.groups, ['G20'])
+        self.assertEqual(arguments.processes, 1)
+
+    def test_no_group(self):
+        self.assertIn('no group selected', rejected(['--groups']))
+        self.assertIsNone(rejected(['--groups', '--countries', 'USA']))
+
+    def test_processes_must_be_positive(self):
+        for value in ('0', '-2', 'two'):
+            self.assertIn('--processes', rejected(['--processes', value]))
+        self.assertEqual(run_analysis.parse_arguments(['--processes', '3']).processes, 3)
+
+    def test_parquet_requires_an_engine(self):
+        with mock.patch.object(run_analysis.importlib.util, 'find_spec', return_value=None):
+            self.assertIn('pyarrow or fastparquet', rejected(['--formats', 'csv', 'parquet']))
+            self.assertIsNone(rejected(['--formats', 'csv', 'json']))
+
+class MainTest(unittest.TestCase):
+
+    def test_writes_the_tables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            crises_path, maddison_path = write_raw_datasets(directory)
+            output = os.path.join(directory, 'results')
+            with contextlib.redirect_stdout(io.StringIO()):
+                status = run_analysis.main(['--crises-path', crises_path, '--maddison-path', maddison_path,
+                                            '--groups', '--countries', *COUNTRIES, '--methods', '1', '2',
+                                            '--output', output, '--formats', 'csv', 'json'])
+            self.assertEqual(status, 0)
+            self.assertEqual(sorted(os.listdir(output)), ['counts.csv', 'counts.json', 'patterns.csv', 'patterns.json'])
+
+            # The tables are the ones of a sweep on the same data
+            results, outputs = sweep.sweep(load_crises(crises_path), load_maddison(maddison_path), {'CUSTOM': COUNTRIES}, (1, 2))
+            patterns = pd.read_csv(os.path.join(output, 'patterns.csv'))
+            pd.testing.assert_frame_equal(patterns, results.reset_index(drop=True), check_dtype=False)
+            counts = pd.read_csv(os.path.join(output, 'counts.csv'))
+            pd.testing.assert_frame_equal(counts, run_analysis.frequency_rows(outputs), check_dtype=False)
+            pd.testing.assert_frame_equal(pd.read_json(os.path.join(output, 'counts.json')), counts, check_dtype=False)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+'''
+Tests of the RaggedSeries container, against the lists of lists it stands for. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from panels import random_lists
+from series import RaggedSeries
+
+class RaggedSeriesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.lists = random_lists()
+        self.events = pd.DataFrame({'event': np.arange(len(self.lists))})
+        self.series = RaggedSeries.from_lists(self.lists, self.events)
+
+    def test_behaves_like_the_lists(self):
+        self.assertEqual(len(self.series), len(self.lists))
+        self.assertEqual(self.series.to_lists(), self.lists)
+        self.assertEqual([serie.tolist() for serie in self.series], self.lists)
+        self.assertEqual(list(self.series.lengths), [len(sublist) for sublist in self.lists])
+        for i in (0, 7, len(self.lists) - 1, -1, -len(self.lists)):
+            self.assertEqual(self.series[i].tolist(), self.lists[i])
+        self.assertEqual(len(RaggedSeries.from_lists([])), 0)
+
+    def test_select(self):
+        mask = np.arange(len(self.lists)) % 3 == 0
+        positions = [5, 2, 2, 30]
+        for key, expected in ((slice(3, 20, 2), self.lists[3:20:2]),
+                              (mask, [sublist for sublist, keep in zip(self.lists, mask) if keep]),
+                              (positions, [self.lists[i] for i in positions])):
+            selected = self.series[key]
+            self.assertIsInstance(selected, RaggedSeries)
+            self.assertEqual(selected.to_lists(), expected)
+            self.assertEqual(list(selected.events['event']), list(np.arange(len(self.lists))[key]))
+
+        self.assertEqual(self.series.select(np.zeros(len(self.lists), dtype=bool)).to_lists(), [])
+
+    def test_by_duration(self):
+        durations = [i % 4 for i in range(len(self.lists))]
+        for length in range(5):
+            expected = [sublist for sublist, duration in zip(self.lists, durations) if duration == length]
+            self.assertEqual(self.series.by_duration(durations, length).to_lists(), expected)
+
+    def test_normalize(self):
+        expected = [[round(value - sublist[0], 2) for value in sublist] for sublist in self.lists]
+        self.assertEqual(self.series.normalize().to_lists(), expected)
+        self.assertIs(self.series.normalize().events, self.events)
+
+    def test_to_padded(self):
+        matrix, mask = self.series.to_padded()
+        width = max(len(sublist) for sublist in self.lists)
+        self.assertEqual(matrix.shape, (len(self.lists), width))
+        for row, valid, sublist in zip(matrix, mask, self.lists):
+            self.assertEqual(row[valid].tolist(), sublist)
+            self.assertTrue(np.isnan(row[~valid]).all())
+
+        # Series of the same length are a view of the values
+        same = RaggedSeries.from_lists([[1.0, 2.0], [3.0, 4.0]])
+        matrix, mask = same.to_padded()
+        self.assertTrue(np.shares_memory(matrix, same.values))
+        self.assertTrue(mask.all())
+
+        matrix, mask = RaggedSeries.from_lists([]).to_padded()
+        self.assertEqual(matrix.shape, (0, 0))
+
+    def test_from_windows(self):
+        windows = np.arange(12.0).reshape(3, 4)
+        valid = np.array([[True, True, False, False], [True, True, True, True], [True, False, False, False]])
+        kept = np.array([True, False, True])
+        series = RaggedSeries.from_windows(windows, valid, kept, self.events.iloc[:3])
+        self.assertEqual(series.to_lists(), [[0.0, 1.0], [8.0]])
+        self.assertEqual(list(series.events['event']), [0, 2])
+
+if __name__ == '__main__':
+    unittest.main()
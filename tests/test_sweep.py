@@ -0,0 +1,78 @@
+'''
+Compare the sweep over country groups with the functions of the notebooks run on each group. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dataset
+import extraction_method_1
+import extraction_method_2
+import sweep
+from synthetic import synthetic_datasets
+from visualisation import compute_pattern, select_by_crisis_length
+
+MODULES = {1: extraction_method_1, 2: extraction_method_2}
+
+class SweepTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.main_data, cls.GDP_pc = synthetic_datasets(16, 120, seed=3)
+        codes = list(cls.main_data['CC3'].unique())
+        rng = np.random.default_rng(0)
+        # Groups out of order, overlapping, with a single country and with a country without data
+        cls.groups = {'A': list(rng.permutation(codes)[:6]), 'B': codes[4:12][::-1], 'C': [codes[3]], 'D': codes[:2] + ['XXX']}
+        cls.results, cls.outputs = sweep.sweep(cls.main_data, cls.GDP_pc, cls.groups)
+
+    def test_slice_is_the_panel_of_the_group(self):
+        union = list(pd.Index(sum(self.groups.values(), [])).unique())
+        panels = sweep.build_panels(self.main_data, self.GDP_pc, union)
+        for group, countries in self.groups.items():
+            expected = sweep.build_panels(self.main_data, self.GDP_pc, countries)
+            for how, (data, events) in panels.items():
+                with self.subTest(group=group, how=how):
+                    sliced, sliced_events = sweep.slice_panel(data, events, countries)
+                    pd.testing.assert_frame_equal(sliced, expected[how][0])
+                    pd.testing.assert_frame_equal(sliced_events, expected[how][1])
+
+    def test_same_as_the_notebooks(self):
+        for group, countries in self.groups.items():
+            for method, module in MODULES.items():
+                for variable, (how, normalize) in sweep.VARIABLES.items():
+                    message = f'{variable} of group {group} with method {method}'
+                    data = dataset.concat_dataset(self.main_data, self.GDP_pc, countries, how)
+                    dataset.dummy_variable(data)
+                    output = self.outputs[(group, method)][variable]
+
+                    durations = module.compute_crisis_duration(data)
+                    self.assertEqual(list(output['durations']), list(durations), message)
+                    pd.testing.assert_frame_equal(output['frequency'], module.length_frequency(durations))
+
+                    extract = module.extract_inflation_series if variable == 'annual_inflation' else module.extract_output_gap_series
+                    series = extract(data)
+                    if normalize:
+                        series = module.normalize_serie(series)
+                    self.assertEqual(str(output['series'].to_lists()), str(series), message)
+
+                    rows = self.results[(self.results['group'] == group) & (self.results['method'] == method) &
+                                        (self.results['variable'] == variable)]
+                    for length in output['frequency']['Length in years']:
+                        pattern, counts = compute_pattern(select_by_crisis_length(series, durations, length))
+                        selected = rows[(rows['phase'] == 'series') & (rows['duration'] == length)]
+                        np.testing.assert_array_equal(selected['pattern'], pattern, err_msg=f'{message}, length {length}')
+                        self.assertEqual(list(selected['data_points']), counts, message)
+
+    def test_processes(self):
+        results, _ = sweep.sweep(self.main_data, self.GDP_pc, self.groups, processes=2)
+        pd.testing.assert_frame_equal(results, self.results)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+'''
+Tests of the synthetic datasets used by the benchmarks and the tests. From the repository root:
+
+    python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import synthetic_datasets
+
+class SyntheticTest(unittest.TestCase):
+
+    def test_schema(self):
+        main_data, GDP_pc = synthetic_datasets(30, 120, seed=1)
+        self.assertEqual(list(main_data.columns), ['Case', 'CC3', 'Country', 'Year', 'banking_crisis', 'notes', 'systemic_crisis',
+                                                   'gold_standard', 'annual_inflation', 'currency_crisis', 'inflation_crisis'])
+        self.assertEqual(list(GDP_pc.columns), ['Entity', 'Code', 'Year', 'GDP_per_capita'])
+        self.assertEqual(main_data.index[0], 1)
+        self.assertEqual(main_data['CC3'].nunique(), 30)
+
+        # The years of each country follow each other up to the last year, and the GDP series are inside them
+        for code, years in main_data.groupby('CC3')['Year']:
+            self.assertEqual(list(years), list(range(years.iloc[0], 2017)), code)
+            self.assertLessEqual(len(years), 120)
+        merged = GDP_pc.merge(main_data, left_on=['Code', 'Year'], right_on=['CC3', 'Year'], how='left')
+        self.assertFalse(merged['CC3'].isna().any())
+        self.assertTrue((GDP_pc['GDP_per_capita'] > 0).all())
+
+        # The flags are 0, 1 or missing
+        for column in ('banking_crisis', 'currency_crisis', 'inflation_crisis'):
+            self.assertTrue(main_data[column].dropna().isin([0, 1]).all(), column)
+            self.assertTrue(main_data[column].isna().any(), column)
+        self.assertTrue(main_data['annual_inflation'].isna().any())
+
+    def test_deterministic(self):
+        for expected, actual in zip(synthetic_datasets(10, 80, seed=5), synthetic_datasets(10, 80, seed=5)):
+            pd.testing.assert_frame_equal(actual, expected)
+        other, _ = synthetic_datasets(10, 80, seed=6)
+        self.assertFalse(other.equals(synthetic_datasets(10, 80, seed=5)[0]))
+
+    def test_crises_shape_the_patterns(self):
+        # Inflation jumps during inflation crises and GDP per capita grows more slowly during banking crises
+        main_data, GDP_pc = synthetic_datasets(50, 150, seed=2)
+        inflation = main_data.groupby('inflation_crisis')['annual_inflation'].mean()
+        self.assertGreater(inflation[1] - inflation[0], 30)
+
+        growth = np.log(GDP_pc['GDP_per_capita']).groupby(GDP_pc['Code']).diff()
+        banking = GDP_pc[['Code', 'Year']].merge(main_data[['CC3', 'Year', 'banking_crisis']], left_on=['Code', 'Year'],
+                                                 right_on=['CC3', 'Year'])['banking_crisis']
+        self.assertLess(growth[banking.to_numpy() == 1].mean(), growth[banking.to_numpy() == 0].mean())
+
+if __name__ == '__main__':
+    unittest.main()